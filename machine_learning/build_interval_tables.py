@@ -0,0 +1,59 @@
+# machine_learning/build_interval_tables.py
+"""Build conformal prediction-interval tables for the shipped models.
+
+Run from the project root after retraining:
+    python machine_learning/build_interval_tables.py
+
+Applies the same cleaning as the training notebooks and writes
+`<model>_intervals.joblib` next to each model in machine_learning/weights.
+"""
+import sys
+from pathlib import Path
+
+import joblib
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.conformal import build_interval_table, save_interval_table
+
+DATA_PATH = ROOT / "ev_journeys.csv"
+WEIGHTS_DIR = ROOT / "machine_learning" / "weights"
+FEATURES = ["google_map_km", "google_map_estimate_time"]
+
+
+def load_training_data():
+    """Load journeys filtered the same way as in the training notebooks"""
+    df = pd.read_csv(DATA_PATH)
+    df = df[
+        (df["drivable_km_before"] > df["drivable_km_after"])
+        & (df["total_km_before"] < df["total_km_after"])
+    ].copy()
+    df["battery_usage"] = df["battery_percent_before"] - df["battery_percent_after"]
+
+    start_time = pd.to_datetime(df["date_before"] + " " + df["timestamp_before"], errors="coerce")
+    end_time = pd.to_datetime(df["date_after"] + " " + df["timestamp_after"], errors="coerce")
+    df["actual_drive_time"] = (end_time - start_time).dt.total_seconds() / 60
+    return df
+
+
+def main():
+    df = load_training_data()
+    time_df = df.dropna(subset=["actual_drive_time"])
+    time_df = time_df[time_df["actual_drive_time"] >= 0]
+
+    targets = [
+        ("actual_time_drive_model", time_df, "actual_drive_time"),
+        ("battery_usage_model", df, "battery_usage"),
+    ]
+    for name, data, target in targets:
+        model = joblib.load(WEIGHTS_DIR / f"{name}.joblib")
+        table = build_interval_table(model, data[FEATURES], data[target])
+        path = WEIGHTS_DIR / f"{name}_intervals.joblib"
+        save_interval_table(table, path)
+        print(f"{path.name}: {table['samples']} journeys, pooled 90% ±{table['pooled'][1]:.2f}")
+
+
+if __name__ == "__main__":
+    main()
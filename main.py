@@ -7,7 +7,14 @@ from tabs.track_journey import show_track_journey_tab
 from tabs.view_history import show_view_history_tab
 from tabs.analytics import show_analytics_tab
 from tabs.predictions import show_predictions_tab
-from utils.data_manager import load_data, save_data
+from utils.data_manager import (
+    load_data, save_data, list_vehicles, add_vehicle, DEFAULT_VEHICLE
+)
+from utils.warmup import start_warmup, get_warmup_status
+
+# Preload models, data and analytics caches once per server process
+# (a no-op when the server was started with run.py, which warms up before any session)
+start_warmup()
 
 # Set page config
 st.set_page_config(
@@ -25,6 +32,51 @@ if 'last_journey' not in st.session_state:
     st.session_state.last_journey = None
 if 'editing_start' not in st.session_state:
     st.session_state.editing_start = False
+if 'vehicle_id' not in st.session_state:
+    st.session_state.vehicle_id = DEFAULT_VEHICLE
+
+def reset_vehicle_state():
+    """Drop per-vehicle session state when switching vehicles"""
+    st.session_state.journey_state = 'no_journey'
+    st.session_state.last_journey = None
+    st.session_state.editing_start = False
+    st.session_state.pop('edited_df', None)
+
+def create_vehicle():
+    """Add the vehicle entered in the sidebar and switch to it"""
+    new_vehicle = st.session_state.new_vehicle_id.strip()
+    if not new_vehicle:
+        return
+    try:
+        st.session_state.vehicle_id = add_vehicle(new_vehicle)
+        st.session_state.new_vehicle_id = ''
+        reset_vehicle_state()
+    except ValueError as e:
+        st.session_state.vehicle_error = str(e)
+
+# Vehicle selection
+with st.sidebar:
+    st.header("Vehicle")
+    st.selectbox("Select Vehicle", list_vehicles(), key='vehicle_id',
+                 on_change=reset_vehicle_state)
+    st.text_input("New Vehicle ID", key='new_vehicle_id',
+                  help="Letters, numbers, '-' and '_' only")
+    st.button("Add Vehicle", on_click=create_vehicle)
+    if 'vehicle_error' in st.session_state:
+        st.error(st.session_state.pop('vehicle_error'))
+
+    # Server warm-up readiness and stage timings
+    warmup = get_warmup_status()
+    with st.expander(f"Server Status: {warmup['state'].title()}"):
+        for stage, info in warmup['stages'].items():
+            timing = f" ({info['seconds']:.2f}s)" if info['seconds'] is not None else ""
+            st.caption(f"**{stage.title()}**: {info['state']}{timing}")
+            if info['detail']:
+                st.caption(info['detail'])
+        if warmup['seconds'] is not None:
+            st.caption(f"Total warm-up: {warmup['seconds']:.2f}s")
+
+vehicle_id = st.session_state.vehicle_id
 
 # Main title
 st.title("🚗 EV Journey Tracker")
@@ -33,14 +85,14 @@ st.title("🚗 EV Journey Tracker")
 tab1, tab2, tab3, tab4 = st.tabs(["Track Journey", "View History", "Analytics", "Predictions"])
 
 # Load data
-df = load_data()
+df = load_data(vehicle_id)
 
 # Show appropriate tab content
 with tab1:
-    show_track_journey_tab(df)
+    show_track_journey_tab(df, vehicle_id)
 with tab2:
-    show_view_history_tab(df)
+    show_view_history_tab(df, vehicle_id)
 with tab3:
-    show_analytics_tab(df)
+    show_analytics_tab(df, vehicle_id)
 with tab4:
-    show_predictions_tab()
\ No newline at end of file
+    show_predictions_tab(df, vehicle_id)
\ No newline at end of file
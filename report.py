@@ -0,0 +1,160 @@
+# report.py
+"""Headless analytics reports for cron and batch jobs.
+
+Examples:
+    python report.py --start 2025-02-01 --end 2025-02-28
+    python report.py --fleet --format csv --output fleet.csv
+    python report.py --vehicle car-2 --format html --output car-2.html
+
+Only the standard library is imported up front; pandas and the data layer
+are loaded once a report is actually computed, and streamlit never is.
+Reports never write app state. Battery health covers the full history, so it
+is only included when no --start/--end range is given.
+"""
+import argparse
+import csv
+import html
+import io
+import json
+import math
+import sys
+from datetime import date
+from functools import partial
+
+FORMATS = ('json', 'csv', 'html')
+SECTIONS = ('battery_overview', 'efficiency_trends', 'time_analysis', 'consumption_patterns',
+            'battery_health')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate EV journey analytics reports")
+    parser.add_argument('--start', type=date.fromisoformat,
+                        help="First journey date to include (YYYY-MM-DD)")
+    parser.add_argument('--end', type=date.fromisoformat,
+                        help="Last journey date to include (YYYY-MM-DD)")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--vehicle', action='append', dest='vehicles',
+                        help="Vehicle to report on (repeatable, default: default)")
+    target.add_argument('--fleet', action='store_true',
+                        help="Report on every vehicle")
+    parser.add_argument('--format', choices=FORMATS, default='json')
+    parser.add_argument('-o', '--output', help="Output file (default: stdout)")
+    return parser.parse_args(argv)
+
+
+def _plain(value):
+    """Convert numpy/pandas scalars to JSON-safe Python values"""
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def vehicle_report(vehicle_id, start=None, end=None):
+    """Compute the report of one vehicle partition"""
+    from utils.data_manager import read_partition, get_battery_health
+    from utils.metrics import build_report
+
+    report = build_report(read_partition(vehicle_id), start, end)
+    if start is None and end is None:
+        # The estimate always covers the full history, so it only fits unfiltered reports;
+        # reports never write app state
+        report['battery_health'] = get_battery_health(vehicle_id, persist=False) or {}
+    return _plain({'vehicle': vehicle_id, **report})
+
+
+def flatten(report):
+    """One flat row of headline metrics per vehicle"""
+    row = {key: report[key] for key in ('vehicle', 'start', 'end', 'journeys', 'valid_journeys')}
+    for section in SECTIONS:
+        row.update(report.get(section, {}))
+    return row
+
+
+def to_json(reports):
+    return json.dumps(reports, indent=2, ensure_ascii=False)
+
+
+def to_csv(reports):
+    rows = [flatten(report) for report in reports]
+    fields = list(dict.fromkeys(key for row in rows for key in row))
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=fields)
+    writer.writeheader()
+    writer.writerows(rows)
+    return output.getvalue()
+
+
+def _html_table(rows):
+    if not rows:
+        return '<p>No data</p>'
+    fields = list(dict.fromkeys(key for row in rows for key in row))
+
+    def cell(value):
+        if isinstance(value, float):
+            value = f'{value:.2f}'
+        return html.escape('' if value is None else str(value))
+
+    header = ''.join(f'<th>{html.escape(field)}</th>' for field in fields)
+    body = ''.join(
+        '<tr>' + ''.join(f'<td>{cell(row.get(field))}</td>' for field in fields) + '</tr>'
+        for row in rows
+    )
+    return f'<table><thead><tr>{header}</tr></thead><tbody>{body}</tbody></table>'
+
+
+def to_html(reports):
+    parts = [
+        '<!DOCTYPE html><html><head><meta charset="utf-8">',
+        '<title>EV Journey Report</title></head><body>',
+        '<h1>EV Journey Report</h1>',
+        '<h2>Summary</h2>',
+        _html_table([flatten(report) for report in reports])
+    ]
+    for report in reports:
+        parts.append(f"<h2>Temperature Impact: {html.escape(report['vehicle'])}</h2>")
+        parts.append(_html_table(report.get('temperature_breakdown', [])))
+    parts.append('</body></html>')
+    return '\n'.join(parts)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    from utils.data_manager import list_vehicles, map_partitions, DEFAULT_VEHICLE
+
+    known = list_vehicles()
+    if args.fleet:
+        vehicles = known
+    else:
+        vehicles = args.vehicles or [DEFAULT_VEHICLE]
+        unknown = [vehicle for vehicle in vehicles if vehicle not in known]
+        if unknown:
+            print(f"error: unknown vehicle(s): {', '.join(unknown)} "
+                  f"(known: {', '.join(known)})", file=sys.stderr)
+            return 2
+
+    try:
+        results = map_partitions(partial(vehicle_report, start=args.start, end=args.end), vehicles)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    reports = [results[vehicle] for vehicle in vehicles]
+    content = {'json': to_json, 'csv': to_csv, 'html': to_html}[args.format](reports)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+    else:
+        sys.stdout.write(content)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
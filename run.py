@@ -0,0 +1,21 @@
+# run.py
+"""Start the Streamlit server with the warm-up already running.
+
+`streamlit run main.py` can only start warming up once the first visitor's
+session runs the script, so that visitor still waits for models and data.
+This launcher starts the warm-up in the server process before any session:
+    python run.py [streamlit options, e.g. --server.port 8080]
+"""
+import sys
+from pathlib import Path
+
+from streamlit.web import cli
+
+from utils.warmup import start_warmup
+
+MAIN_SCRIPT = Path(__file__).resolve().parent / 'main.py'
+
+if __name__ == '__main__':
+    start_warmup()
+    sys.argv = ['streamlit', 'run', str(MAIN_SCRIPT), *sys.argv[1:]]
+    sys.exit(cli.main())
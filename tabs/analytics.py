@@ -1,88 +1,41 @@
 # tabs/analytics.py
 import streamlit as st
 import pandas as pd
-import numpy as np
-
-def calculate_analytics_data(df):
-    """Calculate all analytics metrics from the dataframe with focus on battery efficiency"""
-    df = df.copy()
-    
-    # Basic distance and battery calculations
-    df['actual_distance'] = df['total_km_after'] - df['total_km_before']
-    df['battery_used'] = df['battery_percent_before'] - df['battery_percent_after']
-    df['avg_temperature'] = (df['temperature_before'] + df['temperature_after']) / 2
-    
-    # Time and speed calculations - fixed by combining date and time
-    df['start_datetime'] = pd.to_datetime(df['date_before'] + ' ' + df['timestamp_before'])
-    df['end_datetime'] = pd.to_datetime(df['date_after'] + ' ' + df['timestamp_after'])
-    df['actual_time'] = df['end_datetime'] - df['start_datetime']
-    df['actual_time_minutes'] = df['actual_time'].dt.total_seconds() / 60
-    df['time_difference'] = df['actual_time_minutes'] - df['google_map_estimate_time']
-    df['time_accuracy'] = (df['google_map_estimate_time'] / df['actual_time_minutes']) * 100
-    df['average_speed'] = df['actual_distance'] / (df['actual_time_minutes'] / 60)  # km/h
-    
-    # Filter valid data before calculating efficiency
-    valid_data = df[
-        (df['battery_used'] > 0) & 
-        (df['actual_distance'] > 0) &
-        (df['actual_time_minutes'] > 0)
-    ].copy()
-    
-    if not valid_data.empty:
-        # Battery efficiency metrics
-        valid_data['km_per_battery'] = valid_data['actual_distance'] / valid_data['battery_used']
-        valid_data['km_per_hour'] = valid_data['actual_distance'] / (valid_data['actual_time_minutes'] / 60)
-        valid_data['battery_per_hour'] = valid_data['battery_used'] / (valid_data['actual_time_minutes'] / 60)
-        
-        # Categorize temperatures
-        valid_data['temp_category'] = pd.cut(
-            valid_data['avg_temperature'],
-            bins=[-np.inf, 0, 10, 20, 30, np.inf],
-            labels=['Below 0°C', '0-10°C', '10-20°C', '20-30°C', 'Above 30°C']
-        )
-        
-        # Time efficiency categories - add safeguard for divide by zero
-        valid_data['time_accuracy'] = np.where(
-            valid_data['actual_time_minutes'] > 0,
-            (valid_data['google_map_estimate_time'] / valid_data['actual_time_minutes']) * 100,
-            100  # Default to 100% if time is zero
-        )
-        
-        valid_data['time_efficiency'] = pd.cut(
-            valid_data['time_accuracy'],
-            bins=[0, 80, 90, 110, 120, np.inf],
-            labels=['Very Slow', 'Slower', 'On Time', 'Faster', 'Very Fast']
-        )
-    
-    return valid_data
+from utils.data_manager import (
+    list_vehicles, map_partitions, get_battery_health, DEFAULT_VEHICLE
+)
+from utils.battery_health import MIN_BATTERY_PERCENT, REFERENCE_TEMPERATURE
+from utils.metrics import (
+    get_analytics_data, battery_overview, temperature_breakdown,
+    daily_efficiency, efficiency_trends, consumption_patterns, time_analysis,
+    summarize_vehicle
+)
 
 def show_battery_overview(df):
     """Display key battery efficiency metrics"""
     st.subheader("Battery Efficiency Overview")
     
+    overview = battery_overview(df)
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        avg_efficiency = df['km_per_battery'].mean()
         st.metric(
             "Average km per Battery %",
-            f"{avg_efficiency:.2f} km/%",
+            f"{overview['avg_km_per_battery']:.2f} km/%",
             help="Average distance traveled per 1% battery consumption"
         )
     
     with col2:
-        theoretical_range = avg_efficiency * 100
         st.metric(
             "Theoretical Full Range",
-            f"{theoretical_range:.0f} km",
+            f"{overview['theoretical_range_km']:.0f} km",
             help="Estimated range from 100% to 0% based on average efficiency"
         )
     
     with col3:
-        efficiency_variation = df['km_per_battery'].std()
         st.metric(
             "Efficiency Variation",
-            f"±{efficiency_variation:.2f} km/%",
+            f"±{overview['efficiency_std']:.2f} km/%",
             help="Standard deviation in efficiency (lower is more consistent)"
         )
 
@@ -91,12 +44,7 @@ def show_temperature_analysis(df):
     st.subheader("Temperature Impact Analysis")
     
     # Temperature efficiency breakdown
-    temp_efficiency = df.groupby('temp_category')['km_per_battery'].agg([
-        ('avg_efficiency', 'mean'),
-        ('min_efficiency', 'min'),
-        ('max_efficiency', 'max'),
-        ('journey_count', 'count')
-    ]).reset_index()
+    temp_efficiency = temperature_breakdown(df)
     
     # Display temperature efficiency table
     st.write("Efficiency by Temperature Range")
@@ -122,44 +70,29 @@ def show_efficiency_trends(df):
     """Display efficiency trends over time"""
     st.subheader("Efficiency Trends")
     
-    # Prepare data for the time series
-    trend_data = pd.DataFrame({
-        'Date': pd.to_datetime(df['date_before']),
-        'Efficiency (km/%)': df['km_per_battery']
-    })
-    
     # Group by date and calculate average efficiency
-    daily_efficiency = (trend_data
-        .groupby('Date')['Efficiency (km/%)']
-        .mean()
-        .reset_index()
-        .sort_values('Date'))
+    daily = daily_efficiency(df)
     
     # Display the line chart
     st.line_chart(
-        daily_efficiency.set_index('Date')
+        daily.set_index('Date')
     )
     
     # Calculate trend statistics
-    recent_efficiency = daily_efficiency.iloc[-1]['Efficiency (km/%)']
-    avg_efficiency = daily_efficiency['Efficiency (km/%)'].mean()
-    efficiency_change = ((recent_efficiency - avg_efficiency) / avg_efficiency) * 100
+    trends = efficiency_trends(daily)
     
     # Display trend metrics
     col1, col2 = st.columns(2)
     with col1:
         st.metric(
             "Most Recent Efficiency",
-            f"{recent_efficiency:.2f} km/%",
-            f"{efficiency_change:+.1f}% vs average",
+            f"{trends['recent_efficiency']:.2f} km/%",
+            f"{trends['efficiency_change_pct']:+.1f}% vs average",
             help="Latest recorded efficiency compared to historical average"
         )
     with col2:
-        # Calculate efficiency trend (positive or negative)
-        if len(daily_efficiency) > 1:
-            first_half_avg = daily_efficiency['Efficiency (km/%)'].iloc[:len(daily_efficiency)//2].mean()
-            second_half_avg = daily_efficiency['Efficiency (km/%)'].iloc[len(daily_efficiency)//2:].mean()
-            trend_change = ((second_half_avg - first_half_avg) / first_half_avg) * 100
+        trend_change = trends['trend_change_pct']
+        if trend_change is not None:
             st.metric(
                 "Efficiency Trend",
                 "Improving" if trend_change > 0 else "Declining",
@@ -183,7 +116,7 @@ def show_battery_consumption_patterns(df):
         st.scatter_chart(consumption_data)
         
         # Calculate and display correlation
-        correlation = df['actual_distance'].corr(df['battery_used'])
+        correlation = consumption_patterns(df)['distance_battery_correlation']
         st.metric(
             "Distance-Battery Correlation",
             f"{correlation:.2f}",
@@ -202,22 +135,21 @@ def show_time_analysis(df):
     """Display time estimation accuracy analysis"""
     st.subheader("Time Estimation Analysis")
     
+    time_stats = time_analysis(df)
     col1, col2 = st.columns(2)
     
     with col1:
-        avg_time_accuracy = df['time_accuracy'].mean()
         st.metric(
             "Average Route Accuracy",
-            f"{avg_time_accuracy:.1f}%",
+            f"{time_stats['avg_time_accuracy']:.1f}%",
             help="How close actual distances match Google Maps estimates"
         )
     
     with col2:
         # Fixed: Use average_speed instead of time_efficiency categorical data
-        avg_speed = df['average_speed'].mean()
         st.metric(
             "Average Speed",
-            f"{avg_speed:.1f} km/h",
+            f"{time_stats['avg_speed_kmh']:.1f} km/h",
             help="Average travel speed"
         )
     
@@ -229,13 +161,88 @@ def show_time_analysis(df):
     })
     st.line_chart(accuracy_data.set_index('Date'))
 
-def show_analytics_tab(df):
+def show_battery_health(df, vehicle_id):
+    """Display battery state-of-health estimated from range readings"""
+    st.subheader("Battery Health")
+
+    health = get_battery_health(vehicle_id)
+    if health is None:
+        st.info("Not enough range readings to estimate battery health yet.")
+        return
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric(
+            "Estimated State of Health",
+            "N/A" if health['soh_percent'] is None else f"{health['soh_percent']:.1f}%",
+            help="Estimated full range now compared to the first recorded journeys"
+        )
+    with col2:
+        st.metric(
+            "Estimated Full Range",
+            f"{health['full_range_km']:.0f} km",
+            f"{health['full_range_km'] - health['baseline_range_km']:+.0f} km since {health['baseline_odometer']:.0f} km",
+            help=f"Range shown at 100% battery and {REFERENCE_TEMPERATURE:.0f}°C"
+        )
+    with col3:
+        st.metric(
+            "Range Change per 10,000 km",
+            f"{health['range_change_per_10000_km']:+.1f} km",
+            help="Trend of full range with odometer (battery degradation)"
+        )
+    with col4:
+        st.metric(
+            "Temperature Effect",
+            f"{health['range_change_per_degree']:+.2f} km/°C",
+            help="Change in full range per degree of temperature"
+        )
+
+    # Implied full range of every reading against the fitted trend
+    readings = pd.concat([
+        pd.DataFrame({
+            'Odometer (km)': df[f'total_km_{when}'],
+            'Implied Full Range (km)': df[f'drivable_km_{when}'] / df[f'battery_percent_{when}'] * 100
+        })[df[f'battery_percent_{when}'] >= MIN_BATTERY_PERCENT]
+        for when in ('before', 'after')
+    ], ignore_index=True)
+    readings[f'Trend at {REFERENCE_TEMPERATURE:.0f}°C (km)'] = (
+        health['baseline_range_km']
+        + health['range_change_per_10000_km'] * (readings['Odometer (km)'] - health['baseline_odometer']) / 10000
+    )
+    st.write("Implied Full Range vs Odometer")
+    st.scatter_chart(
+        readings,
+        x='Odometer (km)',
+        y=['Implied Full Range (km)', f'Trend at {REFERENCE_TEMPERATURE:.0f}°C (km)']
+    )
+
+def show_fleet_overview():
+    """Display fleet-wide metrics computed across all vehicle partitions"""
+    vehicles = list_vehicles()
+    if len(vehicles) < 2:
+        return
+
+    st.subheader("Fleet Overview")
+    summaries = map_partitions(summarize_vehicle, vehicles)
+    fleet_df = pd.DataFrame(list(summaries.values()))
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Vehicles", len(fleet_df))
+    with col2:
+        st.metric("Total Journeys", int(fleet_df['Journeys'].sum()))
+    with col3:
+        st.metric("Total Distance", f"{fleet_df['Distance (km)'].sum():.0f} km")
+    
+    st.dataframe(fleet_df.round(2), hide_index=True)
+
+def show_analytics_tab(df, vehicle_id=DEFAULT_VEHICLE):
     """Display the analytics tab content with focus on battery efficiency"""
     st.header("Battery & Range Analytics")
     
     if not df.empty:
         # Calculate analytics data first
-        analytics_df = calculate_analytics_data(df)
+        analytics_df = get_analytics_data(vehicle_id)
         
         if not analytics_df.empty:
             # Show all analysis sections
@@ -244,7 +251,10 @@ def show_analytics_tab(df):
             show_temperature_analysis(analytics_df)
             show_time_analysis(analytics_df)
             show_battery_consumption_patterns(analytics_df)
+            show_battery_health(df, vehicle_id)
         else:
             st.warning("No valid journey data available for analysis. Please ensure journeys are recorded with proper battery and distance measurements.")
     else:
-        st.info("No journey data available for analytics yet.")
\ No newline at end of file
+        st.info("No journey data available for analytics yet.")
+    
+    show_fleet_overview()
\ No newline at end of file
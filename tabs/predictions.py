@@ -1,28 +1,34 @@
 # tabs/predictions.py
 import streamlit as st
 import pandas as pd
-import numpy as np
-import joblib
-import os
-from pathlib import Path
 
-# Path to the model files
-MODELS_DIR = Path("machine_learning/weights")
-TIME_MODEL_PATH = MODELS_DIR / "actual_time_drive_model.joblib"
-BATTERY_MODEL_PATH = MODELS_DIR / "battery_usage_model.joblib"
+from utils.range_risk import build_risk_profile, assess_routes, DEFAULT_SCENARIOS
+from utils.conformal import interval_width
+from utils.cache import file_cached
+from utils.data_manager import get_vehicle_paths, DEFAULT_VEHICLE
+from utils.models import load_model_files, load_interval_files, BATTERY_MODEL_PATH
+
+INTERVAL_LEVEL = 0.9
 
 
 def load_models():
     """Load the machine learning models"""
     try:
-        time_model = joblib.load(TIME_MODEL_PATH)
-        battery_model = joblib.load(BATTERY_MODEL_PATH)
-        return time_model, battery_model
+        return load_model_files()
     except Exception as e:
         st.error(f"Error loading models: {str(e)}")
         return None, None
 
 
+def load_interval_tables():
+    """Load the precomputed prediction-interval tables, if they were built"""
+    try:
+        return load_interval_files()
+    except Exception as e:
+        st.warning(f"Prediction intervals unavailable: {str(e)}")
+        return None, None
+
+
 def predict_time(model, km, estimate_time):
     """Predict actual driving time based on distance and Google Maps estimated time"""
     try:
@@ -51,12 +57,108 @@ def predict_battery(model, km, estimate_time):
         return None
 
 
-def show_predictions_tab():
+def show_range_risk(df, battery_model, vehicle_id=DEFAULT_VEHICLE):
+    """Display Monte Carlo arrival battery risk for planned long trips"""
+    st.subheader("Long Trip Range Risk")
+
+    # Refitting the model to the vehicle is done once per partition and model version
+    profile = file_cached(
+        'risk_profile', (get_vehicle_paths(vehicle_id)['data'], BATTERY_MODEL_PATH),
+        lambda: build_risk_profile(df, battery_model)
+    )
+    if profile is None:
+        st.info("Not enough journey history to estimate range risk yet.")
+        return
+
+    st.write(
+        f"Simulates arrival battery with the battery model refitted to this vehicle, from its "
+        f"held-out errors on {profile['journeys']} past journeys and the effect of temperature "
+        "on consumption."
+    )
+
+    with st.form("range_risk_form"):
+        routes = st.data_editor(
+            pd.DataFrame({
+                'google_map_km': [150.0],
+                'google_map_estimate_time': [120.0],
+                'start_battery': [90.0],
+                'temperature': [25.0]
+            }),
+            key='range_risk_routes',
+            num_rows="dynamic",
+            column_config={
+                "google_map_km": st.column_config.NumberColumn(
+                    "Distance (km)", min_value=0.0, format="%.1f km"
+                ),
+                "google_map_estimate_time": st.column_config.NumberColumn(
+                    "Estimated Time (min)", min_value=0.0, format="%d min"
+                ),
+                "start_battery": st.column_config.NumberColumn(
+                    "Starting Battery %", min_value=0, max_value=100, format="%d%%"
+                ),
+                "temperature": st.column_config.NumberColumn(
+                    "Temperature", min_value=-50, max_value=60, format="%d°C"
+                )
+            },
+            hide_index=True
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            reserve_soc = st.number_input("Reserve Battery %", 0, 100, value=10)
+        with col2:
+            n_scenarios = st.number_input(
+                "Scenarios per Route", 100, 50000, value=DEFAULT_SCENARIOS, step=1000
+            )
+        submitted = st.form_submit_button("Simulate Routes")
+
+    if submitted:
+        routes = routes.dropna()
+        if routes.empty:
+            st.warning("Add at least one route to simulate.")
+            return
+
+        risk = assess_routes(profile, routes, reserve_soc, int(n_scenarios))
+        # Usage range implied by the simulated arrival battery
+        risk['usage_low'] = (risk['start_battery'] - risk['arrival_p95']).clip(0, 100)
+        risk['usage_high'] = (risk['start_battery'] - risk['arrival_p5']).clip(0, 100)
+        if len(risk) == 1:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric(
+                    f"Chance of Arriving Above {reserve_soc}%",
+                    f"{risk['prob_above_reserve'].iloc[0]:.0%}"
+                )
+            with col2:
+                st.metric("Median Arrival Battery", f"{risk['arrival_p50'].iloc[0]:.1f}%")
+            with col3:
+                st.metric(
+                    "Arrival Battery (90% range)",
+                    f"{risk['arrival_p5'].iloc[0]:.1f}% - {risk['arrival_p95'].iloc[0]:.1f}%"
+                )
+        risk_table = pd.DataFrame({
+            'Distance (km)': risk['google_map_km'],
+            'Estimated Time (min)': risk['google_map_estimate_time'],
+            'Starting Battery %': risk['start_battery'],
+            'Predicted Usage %': risk['predicted_usage'].round(1),
+            f'P(Arrival ≥ {reserve_soc}%)': risk['prob_above_reserve'].round(3),
+            'Arrival 5th %ile': risk['arrival_p5'].round(1),
+            'Arrival Median': risk['arrival_p50'].round(1),
+            'Arrival 95th %ile': risk['arrival_p95'].round(1)
+        })
+        risk_table.insert(
+            4, 'Usage 90% Range',
+            risk['usage_low'].map('{:.1f}'.format) + ' - ' + risk['usage_high'].map('{:.1f}'.format)
+        )
+        st.dataframe(risk_table, hide_index=True)
+
+
+def show_predictions_tab(df, vehicle_id=DEFAULT_VEHICLE):
     """Display the predictions tab content"""
     st.header("Journey Predictions")
 
     # Load models
     time_model, battery_model = load_models()
+    time_table, battery_table = load_interval_tables()
 
     if time_model is None or battery_model is None:
         st.warning(
@@ -111,6 +213,14 @@ def show_predictions_tab():
                         f"{predicted_time - google_map_estimate_time:+.1f} min vs Google",
                         help="Based on your driving patterns, this is how long the journey will likely take",
                     )
+                    if time_table is not None:
+                        width = interval_width(
+                            time_table, google_map_km, google_map_estimate_time, INTERVAL_LEVEL
+                        )
+                        st.caption(
+                            f"{INTERVAL_LEVEL:.0%} prediction interval: "
+                            f"{max(predicted_time - width, 0):.1f} - {predicted_time + width:.1f} minutes"
+                        )
 
         with result_col2:
             st.subheader("Battery Usage Prediction")
@@ -127,6 +237,14 @@ def show_predictions_tab():
                         f"{predicted_battery:.1f}%",
                         help="Based on your vehicle's performance, this is how much battery the journey will likely consume",
                     )
+                    if battery_table is not None:
+                        width = interval_width(
+                            battery_table, google_map_km, google_map_estimate_time, INTERVAL_LEVEL
+                        )
+                        st.caption(
+                            f"{INTERVAL_LEVEL:.0%} prediction interval: "
+                            f"{max(predicted_battery - width, 0):.1f}% - {min(predicted_battery + width, 100):.1f}%"
+                        )
 
                     # Calculate the efficiency for reference
                     if predicted_battery > 0:
@@ -137,6 +255,8 @@ def show_predictions_tab():
                             help="Distance covered per percent of battery",
                         )
 
+    show_range_risk(df, battery_model, vehicle_id)
+
     # Additional information about the models
     st.subheader("About the Prediction Models")
     st.info(
@@ -145,6 +265,9 @@ def show_predictions_tab():
     Both models use the same inputs:
     - Google Maps distance (km)
     - Google Maps estimated time (minutes)
+
+    Prediction intervals come from the models' held-out errors on past journeys,
+    grouped by trip distance and estimated time, and cover the actual value about 90% of the time.
     
     Factors that may affect prediction accuracy:
     - Driving style and speed
@@ -3,14 +3,20 @@ import streamlit as st
 from datetime import datetime
 import pandas as pd
 from utils.data_manager import (
-    save_data, get_default_values, save_temp_journey, 
-    load_temp_journey, clear_temp_journey
+    append_journey, get_default_values, save_temp_journey,
+    load_temp_journey, clear_temp_journey, get_vehicle_paths, DEFAULT_VEHICLE
+)
+from utils.telemetry import (
+    telemetry_count, load_telemetry_summary, import_telemetry_csv,
+    clear_telemetry, TELEMETRY_FIELDS
 )
 
 def start_journey(battery_before, drivable_km_before, total_km_before, 
-                 temp_before, google_map_km, google_map_estimate_time):  # Added parameter
+                 temp_before, google_map_km, google_map_estimate_time,  # Added parameter
+                 vehicle_id=DEFAULT_VEHICLE):
     """Initialize a new journey"""
     journey_data = {
+        'journey_id': datetime.now().strftime("%Y%m%d%H%M%S"),
         'battery_percent_before': battery_before,
         'drivable_km_before': drivable_km_before,
         'total_km_before': total_km_before,
@@ -20,13 +26,13 @@ def start_journey(battery_before, drivable_km_before, total_km_before,
         'google_map_km': google_map_km,
         'google_map_estimate_time': google_map_estimate_time  # Added field
     }
-    save_temp_journey(journey_data)
+    save_temp_journey(journey_data, vehicle_id)
     st.session_state.journey_state = 'started'
 
 def complete_journey(battery_after, drivable_km_after, 
-                    total_km_after, temp_after, df):
+                    total_km_after, temp_after, vehicle_id=DEFAULT_VEHICLE):
     """Complete and save the current journey"""
-    temp_journey = load_temp_journey()
+    temp_journey = load_temp_journey(vehicle_id)
     if temp_journey:
         journey = {
             **temp_journey,
@@ -38,19 +44,46 @@ def complete_journey(battery_after, drivable_km_after,
             'date_after': datetime.now().strftime("%Y-%m-%d")
         }
         
-        df_new = pd.concat([df, pd.DataFrame([journey])], ignore_index=True)
-        save_data(df_new)
+        append_journey(journey, vehicle_id)
         
-        clear_temp_journey()
+        clear_temp_journey(vehicle_id)
         st.session_state.journey_state = 'no_journey'
         st.session_state.last_journey = journey
         return True
     return False
 
-def show_track_journey_tab(df):
+def show_journey_telemetry(journey_id, telemetry_root, key='current'):
+    """Display and import in-trip telemetry for a journey"""
+    with st.expander("In-Trip Telemetry"):
+        count = telemetry_count(journey_id, telemetry_root)
+        if count:
+            st.write(f"{count:,} samples recorded")
+            summary = load_telemetry_summary(journey_id, root=telemetry_root)
+            summary['Time'] = pd.to_datetime(summary['timestamp'], unit='s')
+            st.line_chart(summary.set_index('Time')[['soc', 'range']])
+            st.line_chart(summary.set_index('Time')[['speed', 'temperature']])
+        else:
+            st.write("No telemetry recorded for this journey yet.")
+
+        uploaded = st.file_uploader(
+            "Import telemetry CSV", type="csv",
+            help=f"Columns: {', '.join(TELEMETRY_FIELDS)}",
+            key=f'{key}_telemetry_upload'
+        )
+        if uploaded is not None and st.button("Import Telemetry", key=f'{key}_telemetry_import'):
+            try:
+                count = import_telemetry_csv(journey_id, uploaded, root=telemetry_root)
+                st.success(f"Telemetry imported ({count:,} samples)")
+                st.rerun()
+            except Exception as e:
+                st.error(f"Error importing telemetry: {str(e)}")
+
+def show_track_journey_tab(df, vehicle_id=DEFAULT_VEHICLE):
     """Display the track journey tab content"""
+    telemetry_root = get_vehicle_paths(vehicle_id)['telemetry']
+
     # Check for existing temporary journey
-    temp_journey = load_temp_journey()
+    temp_journey = load_temp_journey(vehicle_id)
     if temp_journey and st.session_state.journey_state != 'started':
         st.session_state.journey_state = 'started'
 
@@ -58,7 +91,7 @@ def show_track_journey_tab(df):
         st.header("Start New Journey")
         
         # Get default values
-        defaults = get_default_values()
+        defaults = get_default_values(vehicle_id)
         
         st.subheader("Journey Information")
         col1, col2 = st.columns(2)
@@ -80,13 +113,14 @@ def show_track_journey_tab(df):
         
         if st.button("Start Journey"):
             start_journey(battery_before, drivable_km_before, total_km_before, 
-                        temp_before, google_map_km, google_map_estimate_time)
+                        temp_before, google_map_km, google_map_estimate_time,
+                        vehicle_id)
             st.rerun()
 
     elif st.session_state.journey_state == 'started':
         st.header("Complete Journey")
         
-        temp_journey = load_temp_journey()
+        temp_journey = load_temp_journey(vehicle_id)
         if not temp_journey:
             st.error("Journey data not found! Please start a new journey.")
             if st.button("Start New Journey"):
@@ -136,7 +170,7 @@ def show_track_journey_tab(df):
                         'total_km_before': new_total,
                         'temperature_before': new_temp
                     })
-                    save_temp_journey(temp_journey)
+                    save_temp_journey(temp_journey, vehicle_id)
                     st.session_state.editing_start = False
                     st.success("Start values updated!")
                     st.rerun()
@@ -145,6 +179,8 @@ def show_track_journey_tab(df):
                     st.session_state.editing_start = False
                     st.rerun()
         
+        show_journey_telemetry(temp_journey['journey_id'], telemetry_root)
+
         # After journey inputs with smart defaults
         st.subheader("Current Status")
         default_battery = max(0, temp_journey['battery_percent_before'] - 10)
@@ -160,13 +196,14 @@ def show_track_journey_tab(df):
         with col1:
             if st.button("Complete Journey"):
                 if complete_journey(battery_after, drivable_km_after, 
-                                 total_km_after, temp_after, df):
+                                 total_km_after, temp_after, vehicle_id):
                     st.success("Journey saved successfully!")
                     st.rerun()
                 else:
                     st.error("Failed to save journey. Please try again.")
         with col2:
             if st.button("Cancel Journey"):
-                clear_temp_journey()
+                clear_telemetry(temp_journey['journey_id'], telemetry_root)
+                clear_temp_journey(vehicle_id)
                 st.session_state.journey_state = 'no_journey'
                 st.rerun()
\ No newline at end of file
@@ -1,9 +1,27 @@
 # tabs/view_history.py
 import streamlit as st
-from utils.data_manager import save_data
+from utils.data_manager import save_data, get_vehicle_paths, DEFAULT_VEHICLE
+from tabs.track_journey import show_journey_telemetry
 import pandas as pd
 
-def show_view_history_tab(df):
+def show_recorded_telemetry(df, vehicle_id=DEFAULT_VEHICLE):
+    """Pick a recorded journey and display its telemetry"""
+    st.subheader("Journey Telemetry")
+    journeys = df.dropna(subset=['journey_id']) if 'journey_id' in df.columns else df.iloc[0:0]
+    if journeys.empty:
+        st.info("No journeys recorded with telemetry support yet.")
+        return
+
+    # Most recent journey first
+    labels = {
+        row['journey_id']: f"{row['date_before']} {row['timestamp_before']} - {row['google_map_km']} km"
+        for row in journeys.iloc[::-1].to_dict('records')
+    }
+    journey_id = st.selectbox("Journey", list(labels), format_func=labels.get,
+                              key='history_telemetry_journey')
+    show_journey_telemetry(journey_id, get_vehicle_paths(vehicle_id)['telemetry'], key='history')
+
+def show_view_history_tab(df, vehicle_id=DEFAULT_VEHICLE):
     """Display the view history tab content with editing capabilities"""
     st.header("Journey History")
     
@@ -101,7 +119,7 @@ def show_view_history_tab(df):
             col1, col2 = st.columns([1, 5])
             with col1:
                 if st.button("Save Changes"):
-                    save_data(edited_df)
+                    save_data(edited_df, vehicle_id)
                     st.session_state.edited_df = edited_df
                     st.success("Changes saved successfully!")
                     st.rerun()
@@ -115,8 +133,10 @@ def show_view_history_tab(df):
         st.download_button(
             label="Download Data as CSV",
             data=csv,
-            file_name="ev_journeys.csv",
+            file_name="ev_journeys.csv" if vehicle_id == DEFAULT_VEHICLE else f"ev_journeys_{vehicle_id}.csv",
             mime="text/csv"
         )
+
+        show_recorded_telemetry(df, vehicle_id)
     else:
         st.info("No journeys recorded yet.")
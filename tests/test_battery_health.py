@@ -0,0 +1,51 @@
+# tests/test_battery_health.py
+import numpy as np
+import pytest
+
+from utils.battery_health import (
+    REFERENCE_TEMPERATURE, implied_full_range, new_state, summarize_health, update_state
+)
+
+
+def test_recovers_trend_despite_outliers():
+    rng = np.random.default_rng(0)
+    state = new_state()
+    # 400 km at 25°C, losing 5 km per 10,000 km and gaining 1.5 km per °C
+    for i, odometer in enumerate(np.linspace(10000, 40000, 300)):
+        temperature = rng.uniform(5, 35)
+        full_range = (400 - 5 * (odometer - 10000) / 10000
+                      + 1.5 * (temperature - REFERENCE_TEMPERATURE) + rng.normal(0, 2))
+        if i % 20 == 10:
+            full_range *= 0.5 if i % 40 == 10 else 1.6    # Mistyped readings
+        battery = rng.uniform(30, 100)
+        update_state(state, odometer, battery, full_range * battery / 100, temperature)
+
+    health = summarize_health(state)
+
+    assert health['range_change_per_10000_km'] == pytest.approx(-5, abs=1.5)
+    assert health['range_change_per_degree'] == pytest.approx(1.5, abs=0.2)
+    assert health['baseline_range_km'] == pytest.approx(400, abs=3)
+    assert health['soh_percent'] == pytest.approx(100 * 385 / 400, abs=1)
+    assert health['readings'] == 300
+
+
+def test_needs_warmup_readings_before_summarizing():
+    state = new_state()
+    for odometer in range(4):
+        update_state(state, 1000 + odometer, 80, 320, 25)
+    assert summarize_health(state) is None
+
+    update_state(state, 1004, 80, 320, 25)
+    assert summarize_health(state)['full_range_km'] == pytest.approx(400)
+
+
+def test_unusable_readings_are_skipped():
+    state = new_state()
+    update_state(state, 1000, 5, 20, 25)           # Battery too low
+    update_state(state, 1000, 80, 0, 25)            # No range
+    update_state(state, None, 80, 320, 25)          # Missing odometer
+    update_state(state, 1000, 80, 320, float('nan'))
+
+    assert state['readings'] == 0
+    assert implied_full_range('320', '80') == 400
+    assert implied_full_range('n/a', 80) is None
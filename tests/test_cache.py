@@ -0,0 +1,74 @@
+# tests/test_cache.py
+import os
+import threading
+import time
+
+from utils.cache import file_cached
+
+
+def test_reuses_result_until_file_changes(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_text('a')
+    calls = []
+
+    def loader():
+        calls.append(path.read_text())
+        return path.read_text()
+
+    assert file_cached('test', path, loader) == 'a'
+    assert file_cached('test', path, loader) == 'a'
+    assert calls == ['a']
+
+    path.write_text('bb')
+    assert file_cached('test', path, loader) == 'bb'
+    assert calls == ['a', 'bb']
+
+
+def test_detects_same_size_change(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_text('a')
+    file_cached('test', path, path.read_text)
+
+    path.write_text('b')
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+    assert file_cached('test', path, path.read_text) == 'b'
+
+
+def test_concurrent_callers_share_one_load(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_text('a')
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'loaded'
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(file_cached('test', path, slow_loader)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['loaded'] * 8
+    assert len(calls) == 1
+
+
+def test_tuple_of_paths_invalidates_on_any_change(tmp_path):
+    data, model = tmp_path / 'data.csv', tmp_path / 'model.joblib'
+    data.write_text('a')
+    model.write_text('m')
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return len(calls)
+
+    assert file_cached('test', (data, model), loader) == 1
+    assert file_cached('test', (data, model), loader) == 1
+    model.write_text('m2')
+    assert file_cached('test', (data, model), loader) == 2
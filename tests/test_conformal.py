@@ -0,0 +1,62 @@
+# tests/test_conformal.py
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from utils.conformal import (
+    build_interval_table, interval_width, interval_widths, load_interval_table, save_interval_table
+)
+
+
+def table(n_near=30, n_far=8, seed=0):
+    """Journeys split between the first and last distance bucket"""
+    rng = np.random.default_rng(seed)
+    km = np.concatenate([rng.uniform(1, 9, n_near), rng.uniform(150, 200, n_far)])
+    estimate_time = km * 1.1 + rng.normal(0, 1, len(km))
+    X = np.column_stack([km, estimate_time])
+    y = km / 4 + rng.normal(0, 1, len(km))
+    return build_interval_table(LinearRegression(), X, y,
+                                distance_bins=[10, 100], time_bins=[1000])
+
+
+def test_small_buckets_use_pooled_quantile_per_level():
+    result = table()
+
+    near, far = result['quantiles'][0][0], result['quantiles'][2][0]
+    assert result['counts'][0][0] == 30 and result['counts'][2][0] == 8
+    # 30 journeys calibrate every level; 8 only calibrate 80%
+    assert near != result['pooled']
+    assert far[1:] == [max(far[0], pooled) for pooled in result['pooled'][1:]]
+    assert result['quantiles'][1][0] == result['pooled']      # Empty bucket
+    for row in result['quantiles']:
+        for quantiles in row:
+            assert quantiles == sorted(quantiles)
+
+
+def test_lookup_on_bucket_edges():
+    result = table()
+    result['quantiles'] = [[[float(10 * i + j)] * 3 for j in range(2)] for i in range(3)]
+
+    assert interval_width(result, 9.99, 0) == 0
+    assert interval_width(result, 10, 0) == 10          # Edges belong to the upper bucket
+    assert interval_width(result, 100, 1000) == 21
+    assert interval_width(result, 500, 5000) == 21
+
+
+def test_single_and_batch_lookups_agree():
+    result = table()
+    km = [0, 5, 10, 50, 100, 180, 500]
+    estimate_time = [0, 500, 999, 1000, 2000, 10, 1]
+
+    for level in result['levels']:
+        batch = interval_widths(result, km, estimate_time, level)
+        single = [interval_width(result, k, t, level) for k, t in zip(km, estimate_time)]
+        np.testing.assert_array_equal(batch, single)
+
+
+def test_save_and_load(tmp_path):
+    result = table()
+    save_interval_table(result, tmp_path / 'intervals.joblib')
+
+    assert load_interval_table(tmp_path / 'intervals.joblib') == result
+    assert load_interval_table(tmp_path / 'missing.joblib') is None
@@ -0,0 +1,110 @@
+# tests/test_data_manager.py
+import pytest
+
+import pandas as pd
+
+from utils.data_manager import (
+    DEFAULT_VEHICLE, add_vehicle, append_journey, get_battery_health, get_default_values,
+    get_vehicle_index, list_vehicles, map_partitions, read_partition, save_data
+)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def journey(journey_id, odometer):
+    return {
+        'google_map_km': 10.0, 'google_map_estimate_time': 15,
+        'battery_percent_before': 80, 'drivable_km_before': 320, 'total_km_before': odometer,
+        'temperature_before': 25, 'timestamp_before': '10:00', 'date_before': '2026-10-19',
+        'battery_percent_after': 77, 'drivable_km_after': 308, 'total_km_after': odometer + 10,
+        'temperature_after': 26, 'timestamp_after': '10:15', 'date_after': '2026-10-19',
+        'journey_id': journey_id
+    }
+
+
+def test_journey_id_survives_rewrite(workdir):
+    append_journey(journey('20261019100000', 1000), 'car-1')
+    append_journey(journey('20261019120000', 1010), 'car-1')
+
+    save_data(read_partition('car-1'), 'car-1')
+
+    assert read_partition('car-1')['journey_id'].tolist() == ['20261019100000', '20261019120000']
+    assert '20261019100000.0' not in (workdir / 'data/vehicles/car-1/journeys.csv').read_text()
+
+
+def test_index_detects_same_size_edit(workdir):
+    append_journey(journey('20261019100000', 1000), 'car-1')
+    assert get_vehicle_index('car-1')['last_odometer'] == 1010
+
+    path = workdir / 'data/vehicles/car-1/journeys.csv'
+    path.write_text(path.read_text().replace(',1010,', ',1020,'))
+
+    assert get_vehicle_index('car-1')['last_odometer'] == 1020
+
+
+def test_battery_health_of_unknown_vehicle_creates_nothing(workdir):
+    assert get_battery_health('nope') is None
+    assert 'nope' not in list_vehicles()
+    assert not (workdir / 'data').exists()
+
+
+def test_battery_health_replays_same_size_edit(workdir):
+    for i in range(6):
+        append_journey(journey(f'2026101910000{i}', 1000 + 10 * i), 'car-1')
+    before = get_battery_health('car-1')
+
+    path = workdir / 'data/vehicles/car-1/journeys.csv'
+    path.write_text(path.read_text().replace(',308,', ',208,'))
+
+    assert get_battery_health('car-1')['full_range_km'] < before['full_range_km']
+
+
+def test_index_rebuild_matches_partition(workdir):
+    for i in range(3):
+        append_journey(journey(f'2026101910000{i}', 1000 + 10 * i), 'car-1')
+    (workdir / 'data/vehicles/index.json').unlink()
+
+    entry = get_vehicle_index('car-1')
+
+    assert entry['rows'] == len(read_partition('car-1')) == 3
+    assert (entry['last_odometer'], entry['last_battery'], entry['last_range']) == (1030, 77, 308)
+
+
+def test_list_vehicles_default_first(workdir):
+    add_vehicle('car-b')
+    add_vehicle('car-a')
+
+    assert list_vehicles() == [DEFAULT_VEHICLE, 'car-a', 'car-b']
+    with pytest.raises(ValueError):
+        add_vehicle('../escape')
+
+
+def test_map_partitions(workdir):
+    add_vehicle('car-1')
+
+    assert map_partitions(str.upper) == {DEFAULT_VEHICLE: 'DEFAULT', 'car-1': 'CAR-1'}
+    assert map_partitions(len, ['car-1']) == {'car-1': 5}
+
+
+def test_default_values(workdir):
+    assert get_default_values('car-1') == {'battery': 100, 'range': 0, 'total': 0}
+
+    append_journey(journey('20261019100000', 1000), 'car-1')
+
+    assert get_default_values('car-1') == {'battery': 77, 'range': 308, 'total': 1010}
+
+
+def test_append_with_new_columns_rewrites_partition(workdir):
+    legacy = {key: value for key, value in journey(None, 1000).items() if key != 'journey_id'}
+    save_data(pd.DataFrame([legacy]), 'car-1')
+
+    append_journey(journey('20261019120000', 1010), 'car-1')
+
+    df = read_partition('car-1')
+    assert list(df['total_km_after']) == [1010, 1020]
+    assert pd.isna(df['journey_id'].iloc[0]) and df['journey_id'].iloc[1] == '20261019120000'
+    assert get_vehicle_index('car-1')['rows'] == 2
@@ -0,0 +1,95 @@
+# tests/test_range_risk.py
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from utils.range_risk import (
+    FEATURE_COLUMNS, assess_routes, build_risk_profile, simulate_arrival_soc, summarize_arrival
+)
+
+
+def journeys(used_per_km=0.25, n=30, seed=0):
+    rng = np.random.default_rng(seed)
+    km = rng.uniform(10, 120, n)
+    estimate_time = km * 1.1 + rng.normal(0, 5, n)
+    used = np.round(km * used_per_km + rng.normal(0, 1, n))
+    return pd.DataFrame({
+        'google_map_km': km, 'google_map_estimate_time': estimate_time,
+        'battery_percent_before': 100, 'battery_percent_after': 100 - used,
+        'drivable_km_before': 400, 'drivable_km_after': 400 - km,
+        'total_km_before': 1000, 'total_km_after': 1000 + km,
+        'temperature_before': 25, 'temperature_after': 26,
+        'timestamp_before': '10:00', 'timestamp_after': '11:30',
+        'date_before': '2026-10-19', 'date_after': '2026-10-19'
+    })
+
+
+def shipped_model():
+    df = journeys(seed=1)
+    return LinearRegression().fit(df[FEATURE_COLUMNS], 100 - df['battery_percent_after'])
+
+
+def exact_profile():
+    """Profile whose simulations reproduce the predicted usage exactly"""
+    return {'residuals': np.zeros(1), 'temp_drift': np.zeros(1),
+            'temp_slope': 0.0, 'temp_intercept': 1.0, 'journeys': 1}
+
+
+def test_profile_uses_held_out_errors():
+    df = journeys()
+    model = shipped_model().fit(df[FEATURE_COLUMNS], 100 - df['battery_percent_after'])
+
+    profile = build_risk_profile(df, model)
+
+    # Errors of the model on journeys it was fitted to are narrower
+    in_sample = (100 - df['battery_percent_after']) / model.predict(df[FEATURE_COLUMNS])
+    assert profile['journeys'] == len(df)
+    assert profile['residuals'].std() > (in_sample - in_sample.mean()).std()
+
+
+def test_biased_vehicle_is_predicted_with_its_own_consumption():
+    model = shipped_model()
+    route = pd.DataFrame({'google_map_km': [100.0], 'google_map_estimate_time': [110.0],
+                          'start_battery': [60.0], 'temperature': [25.5]})
+    true_arrival = 60 - 1.5 * model.predict(route[FEATURE_COLUMNS])[0]
+
+    # This vehicle uses 1.5x what the shipped model predicts
+    profile = build_risk_profile(journeys(used_per_km=0.375), model)
+    risk = assess_routes(profile, route, reserve_soc=10, seed=0)
+
+    assert risk['arrival_p50'].iloc[0] == pytest.approx(true_arrival, abs=1.5)
+    assert risk['prob_above_reserve'].iloc[0] > 0.9
+    risk = assess_routes(profile, route, reserve_soc=true_arrival + 5, seed=0)
+    assert risk['prob_above_reserve'].iloc[0] < 0.1
+
+
+def test_too_few_journeys_gives_no_profile():
+    assert build_risk_profile(journeys(n=3), shipped_model()) is None
+
+
+def test_simulation_shape_and_broadcasting():
+    profile = build_risk_profile(journeys(), shipped_model())
+
+    assert simulate_arrival_soc(profile, 20.0, 80, 25, n_scenarios=100).shape == (1, 100)
+    arrival = simulate_arrival_soc(profile, [10.0, 20.0, 30.0], 80, [10, 20, 30], n_scenarios=50)
+    assert arrival.shape == (3, 50)
+    assert np.all(arrival <= 80)
+
+
+def test_simulation_is_deterministic_for_a_seed():
+    profile = build_risk_profile(journeys(), shipped_model())
+
+    first = simulate_arrival_soc(profile, [10.0, 20.0], [80, 60], 25, n_scenarios=200, seed=7)
+    second = simulate_arrival_soc(profile, [10.0, 20.0], [80, 60], 25, n_scenarios=200, seed=7)
+
+    np.testing.assert_array_equal(first, second)
+
+
+def test_reserve_probability():
+    arrival = simulate_arrival_soc(exact_profile(), [30.0, 60.0], [60, 60], 25, n_scenarios=10)
+    np.testing.assert_array_equal(arrival, [[30.0] * 10, [0.0] * 10])
+
+    summary = summarize_arrival(arrival, reserve_soc=10)
+    assert list(summary['prob_above_reserve']) == [1.0, 0.0]
+    assert list(summary['arrival_p50']) == [30.0, 0.0]
@@ -0,0 +1,28 @@
+# tests/test_report.py
+import json
+import shutil
+from pathlib import Path
+
+from report import main
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_unknown_vehicle_is_rejected(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+
+    assert main(['--vehicle', 'typo']) == 2
+    assert 'unknown vehicle' in capsys.readouterr().err
+    assert not (tmp_path / 'data').exists()
+
+
+def test_reports_are_read_only(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    shutil.copy(ROOT / 'ev_journeys.csv', tmp_path)
+
+    assert main([]) == 0
+    assert json.loads(capsys.readouterr().out)[0]['battery_health']['soh_percent'] > 0
+    assert main(['--start', '2030-01-01']) == 0
+    report = json.loads(capsys.readouterr().out)[0]
+    assert report['journeys'] == 0 and 'battery_health' not in report
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['ev_journeys.csv']
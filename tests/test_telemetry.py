@@ -0,0 +1,48 @@
+# tests/test_telemetry.py
+import io
+
+import numpy as np
+import pytest
+
+from utils import telemetry
+from utils.telemetry import (
+    DOWNSAMPLE_FACTOR, TELEMETRY_FIELDS, append_telemetry, import_telemetry_csv,
+    load_telemetry, load_telemetry_summary
+)
+
+HEADER = "timestamp,soc,speed,temperature,range\n"
+
+
+@pytest.mark.parametrize('first, second', [
+    ('1792404000', '1792404001'),
+    ('2026-10-19 10:00:00', '2026-10-19 10:00:01'),
+])
+def test_import_telemetry_csv_timestamps(tmp_path, first, second):
+    csv = io.StringIO(HEADER + f"{first},80,50,25,300\n{second},79.9,51,25,299\n")
+
+    assert import_telemetry_csv('trip', csv, root=str(tmp_path)) == 2
+    samples = load_telemetry('trip', root=str(tmp_path))
+    assert samples['timestamp'].tolist() == [1792404000.0, 1792404001.0]
+    assert samples['soc'].tolist() == [80.0, 79.9]
+
+
+def test_summary_tail_reads_only_unsummarized_remainder(tmp_path, monkeypatch):
+    # Three full level-2 buckets, then 5 level-1 rows and 7 raw samples of tail
+    full = 3 * DOWNSAMPLE_FACTOR ** 2
+    samples = np.random.default_rng(0).normal(size=(full + 5 * DOWNSAMPLE_FACTOR + 7, len(TELEMETRY_FIELDS)))
+    append_telemetry('trip', samples, root=str(tmp_path))
+
+    read_rows = telemetry.read_telemetry_rows
+
+    def small_reads(journey_dir, start=0, stop=None):
+        assert stop - start < DOWNSAMPLE_FACTOR
+        return read_rows(journey_dir, start, stop)
+
+    monkeypatch.setattr(telemetry, 'read_telemetry_rows', small_reads)
+    summary = load_telemetry_summary('trip', max_points=10, root=str(tmp_path))
+
+    assert len(summary) == 4
+    tail, last = samples[full:], summary.iloc[-1]
+    assert np.allclose(last[TELEMETRY_FIELDS], tail.mean(axis=0))
+    assert np.allclose(last[[f'{field}_min' for field in TELEMETRY_FIELDS]], tail.min(axis=0))
+    assert np.allclose(last[[f'{field}_max' for field in TELEMETRY_FIELDS]], tail.max(axis=0))
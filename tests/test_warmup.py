@@ -0,0 +1,42 @@
+# tests/test_warmup.py
+import pytest
+
+from utils import warmup
+
+
+def done():
+    return "ok", []
+
+
+def broken():
+    raise RuntimeError("model file missing")
+
+
+@pytest.mark.parametrize('stages, state, stage_states', [
+    ({'models': done, 'data': done, 'analytics': done}, 'ready', ['done', 'done', 'done']),
+    ({'models': broken, 'data': done, 'analytics': done}, 'degraded', ['failed', 'done', 'done']),
+    ({'models': done, 'data': lambda: ("1 vehicles", ["default: bad"]), 'analytics': done},
+     'degraded', ['done', 'degraded', 'done']),
+])
+def test_run_warmup_states(monkeypatch, stages, state, stage_states):
+    monkeypatch.setattr(warmup, '_STAGE_FUNCTIONS', stages)
+
+    status = warmup.run_warmup()
+
+    assert status['state'] == state
+    assert [status['stages'][name]['state'] for name in warmup.STAGES] == stage_states
+    assert all(stage['seconds'] is not None for stage in status['stages'].values())
+
+
+def test_invalid_journeys_degrade_data_stage(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'ev_journeys.csv').write_text("google_map_km,date_before\n10,not-a-date\n")
+    monkeypatch.setattr(warmup, '_STAGE_FUNCTIONS', {
+        'models': done, 'data': warmup._load_data, 'analytics': done
+    })
+
+    status = warmup.run_warmup()
+
+    assert status['state'] == 'degraded'
+    assert status['stages']['data']['state'] == 'degraded'
+    assert 'missing columns' in status['stages']['data']['detail']
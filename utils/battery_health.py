@@ -0,0 +1,173 @@
+# utils/battery_health.py
+import json
+import math
+import os
+
+# Readings below this battery % give a very noisy implied full range
+MIN_BATTERY_PERCENT = 10
+REFERENCE_TEMPERATURE = 25.0
+ODOMETER_UNIT = 1000.0        # Odometer slope is estimated per 1,000 km
+FORGETTING_FACTOR = 0.999     # Slowly discount old readings so drift is tracked
+HUBER_K = 2.0                 # Residuals beyond HUBER_K * scale are down-weighted
+SCALE_ALPHA = 0.05            # Smoothing of the running residual scale
+MIN_SCALE = 2.0               # km
+WARMUP_READINGS = 5           # Readings buffered to seed the estimate robustly
+PRIOR_VARIANCE = [200.0 ** 2, 20.0 ** 2, 5.0 ** 2]  # intercept, km per 1,000 km, km per °C
+
+
+def new_state():
+    """Empty estimator state (JSON serializable)"""
+    return {
+        'theta': [0.0, 0.0, 0.0],
+        'P': [[PRIOR_VARIANCE[i] if i == j else 0.0 for j in range(3)] for i in range(3)],
+        'scale': None,
+        'odometer_ref': None,
+        'pending': [],
+        'readings': 0,
+        'last_odometer': None,
+        'rows': 0,
+        'size': 0,
+        'mtime_ns': None
+    }
+
+
+def implied_full_range(drivable_km, battery_percent):
+    """Range the car would show at 100%, or None if the reading is unusable"""
+    try:
+        drivable_km, battery_percent = float(drivable_km), float(battery_percent)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(drivable_km) or math.isnan(battery_percent):
+        return None
+    if battery_percent < MIN_BATTERY_PERCENT or drivable_km <= 0:
+        return None
+    return drivable_km / battery_percent * 100
+
+
+def _features(state, odometer, temperature):
+    return [1.0, (odometer - state['odometer_ref']) / ODOMETER_UNIT,
+            temperature - REFERENCE_TEMPERATURE]
+
+
+def _median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+
+def _seed(state):
+    """Start the estimate from the median of the buffered readings"""
+    pending = state['pending']
+    ranges = [full_range for _, full_range, _ in pending]
+    center = _median(ranges)
+    state['odometer_ref'] = pending[0][0]
+    state['theta'][0] = center
+    state['scale'] = max(1.4826 * _median([abs(r - center) for r in ranges]), MIN_SCALE)
+    state['pending'] = []
+    for odometer, full_range, temperature in pending:
+        _rls_update(state, odometer, full_range, temperature)
+
+
+def _rls_update(state, odometer, full_range, temperature):
+    x = _features(state, odometer, temperature)
+    theta, P = state['theta'], state['P']
+    error = full_range - sum(t * xi for t, xi in zip(theta, x))
+
+    limit = HUBER_K * state['scale']
+    weight = 1.0 if abs(error) <= limit else limit / abs(error)
+
+    Px = [sum(P[i][j] * x[j] for j in range(3)) for i in range(3)]
+    denom = FORGETTING_FACTOR / weight + sum(x[i] * Px[i] for i in range(3))
+    gain = [p / denom for p in Px]
+    state['theta'] = [theta[i] + gain[i] * error for i in range(3)]
+    state['P'] = [[(P[i][j] - gain[i] * Px[j]) / FORGETTING_FACTOR for j in range(3)]
+                  for i in range(3)]
+
+    state['scale'] = max((1 - SCALE_ALPHA) * state['scale']
+                         + SCALE_ALPHA * min(abs(error), limit), MIN_SCALE)
+
+
+def update_state(state, odometer, battery_percent, drivable_km, temperature):
+    """Fold one range reading into the estimate in O(1).
+
+    Weighted recursive least squares of implied full range against odometer
+    and temperature, with Huber weights so mistyped readings barely move it.
+    """
+    full_range = implied_full_range(drivable_km, battery_percent)
+    try:
+        odometer, temperature = float(odometer), float(temperature)
+    except (TypeError, ValueError):
+        return state
+    if full_range is None or math.isnan(odometer) or math.isnan(temperature):
+        return state
+
+    state['readings'] += 1
+    state['last_odometer'] = max(odometer, state['last_odometer'] or odometer)
+    if state['odometer_ref'] is None:
+        state['pending'].append([odometer, full_range, temperature])
+        if len(state['pending']) >= WARMUP_READINGS:
+            _seed(state)
+    else:
+        _rls_update(state, odometer, full_range, temperature)
+    return state
+
+
+def add_journey(state, journey):
+    """Fold both range readings of a journey into the estimate"""
+    for when in ('before', 'after'):
+        update_state(
+            state,
+            journey.get(f'total_km_{when}'),
+            journey.get(f'battery_percent_{when}'),
+            journey.get(f'drivable_km_{when}'),
+            journey.get(f'temperature_{when}')
+        )
+    state['rows'] += 1
+    return state
+
+
+def build_state(df):
+    """Replay a full journey history into a fresh estimator state"""
+    state = new_state()
+    for journey in df.to_dict('records'):
+        add_journey(state, journey)
+    return state
+
+
+def predict_full_range(state, odometer, temperature=REFERENCE_TEMPERATURE):
+    """Estimated 100% range at an odometer reading and temperature"""
+    x = _features(state, odometer, temperature)
+    return sum(t * xi for t, xi in zip(state['theta'], x))
+
+
+def summarize_health(state):
+    """Headline state-of-health figures, or None until enough readings are seen"""
+    if state['odometer_ref'] is None:
+        return None
+    baseline = predict_full_range(state, state['odometer_ref'])
+    current = predict_full_range(state, state['last_odometer'])
+    return {
+        'soh_percent': current / baseline * 100 if baseline > 0 else None,
+        'full_range_km': current,
+        'baseline_range_km': baseline,
+        'baseline_odometer': state['odometer_ref'],
+        'odometer': state['last_odometer'],
+        'range_change_per_10000_km': state['theta'][1] * 10000 / ODOMETER_UNIT,
+        'range_change_per_degree': state['theta'][2],
+        'readings': state['readings']
+    }
+
+
+def load_state(path):
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return None
+
+
+def save_state(path, state):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,39 @@
+# utils/cache.py
+import os
+import threading
+
+_entries = {}
+_locks = {}
+_guard = threading.Lock()
+
+
+def _signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def file_cached(namespace, path, loader):
+    """Return loader(), reusing the last result until the file at path changes.
+
+    `path` may also be a tuple of paths; the result is then reused until any
+    of them changes.
+
+    Shared by every session in the server process. Concurrent callers for the
+    same key wait for a single load instead of repeating it, so requests that
+    arrive during warm-up pick up its result.
+    """
+    paths = path if isinstance(path, tuple) else (path,)
+    key = (namespace, tuple(str(p) for p in paths))
+    with _guard:
+        lock = _locks.setdefault(key, threading.Lock())
+    with lock:
+        signature = tuple(_signature(p) for p in paths)
+        entry = _entries.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+        value = loader()
+        _entries[key] = (signature, value)
+        return value
@@ -0,0 +1,129 @@
+# utils/conformal.py
+import math
+from bisect import bisect_right
+
+import numpy as np
+
+# Bucket edges for Google Maps distance (km) and estimated time (minutes)
+DISTANCE_BINS = [10, 25, 50, 100]
+TIME_BINS = [15, 30, 60, 120]
+COVERAGE_LEVELS = (0.8, 0.9, 0.95)
+MIN_BIN_SAMPLES = 8     # Smaller buckets fall back to the pooled quantile
+MAX_LOO_ROWS = 500      # Larger training sets use 5-fold residuals instead
+
+
+def _has_rank(n, level):
+    """Whether n residuals are enough for the corrected rank at this level"""
+    return math.ceil((n + 1) * level) <= n
+
+
+def _conformal_quantile(residuals, level):
+    """Finite-sample corrected quantile of absolute residuals.
+
+    The rank is capped at the largest residual when there are too few
+    residuals for the level; bucket quantiles avoid that through _has_rank.
+    """
+    n = len(residuals)
+    rank = min(math.ceil((n + 1) * level), n)
+    return float(np.sort(residuals)[rank - 1])
+
+
+def _unfitted_copy(model):
+    from sklearn.base import clone
+
+    try:
+        return clone(model)
+    except AttributeError:
+        # Models pickled by an older scikit-learn can lack newer parameters
+        defaults = type(model)().get_params()
+        return type(model)(**{key: getattr(model, key, value) for key, value in defaults.items()})
+
+
+def fit_copy(model, X, y):
+    """Fit a fresh copy of the model, leaving the original untouched"""
+    return _unfitted_copy(model).fit(X, y)
+
+
+def out_of_sample_predictions(model, X, y):
+    """Predict each journey with a copy of the model refitted without it"""
+    from sklearn.model_selection import KFold, LeaveOneOut, cross_val_predict
+
+    cv = LeaveOneOut() if len(X) <= MAX_LOO_ROWS else KFold(5, shuffle=True, random_state=0)
+    return cross_val_predict(_unfitted_copy(model), X, y, cv=cv)
+
+
+def build_interval_table(model, X, y, distance_bins=DISTANCE_BINS,
+                         time_bins=TIME_BINS, levels=COVERAGE_LEVELS):
+    """Precompute conformal residual quantiles per distance/time bucket.
+
+    `X` holds the model's [google_map_km, google_map_estimate_time] inputs.
+    Residuals come from refitting the model without each held-out journey,
+    so the quantiles give calibrated prediction intervals. A bucket level
+    uses the pooled quantile when the bucket has fewer than MIN_BIN_SAMPLES
+    journeys or too few for that level's finite-sample rank.
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    residuals = np.abs(y - out_of_sample_predictions(model, X, y))
+
+    distance_index = np.searchsorted(distance_bins, X[:, 0], side='right')
+    time_index = np.searchsorted(time_bins, X[:, 1], side='right')
+
+    pooled = [_conformal_quantile(residuals, level) for level in levels]
+    quantiles, counts = [], []
+    for i in range(len(distance_bins) + 1):
+        quantile_row, count_row = [], []
+        for j in range(len(time_bins) + 1):
+            in_bin = residuals[(distance_index == i) & (time_index == j)]
+            count_row.append(int(len(in_bin)))
+            # Each level falls back to the pooled quantile when the bucket is too small for it
+            row = [
+                _conformal_quantile(in_bin, level)
+                if len(in_bin) >= MIN_BIN_SAMPLES and _has_rank(len(in_bin), level) else pooled_value
+                for level, pooled_value in zip(levels, pooled)
+            ]
+            # Mixing bucket and pooled values must not make a higher level narrower
+            quantile_row.append(np.maximum.accumulate(row).tolist())
+        quantiles.append(quantile_row)
+        counts.append(count_row)
+
+    return {
+        'distance_bins': list(distance_bins),
+        'time_bins': list(time_bins),
+        'levels': list(levels),
+        'quantiles': quantiles,
+        'counts': counts,
+        'pooled': pooled,
+        'samples': int(len(residuals))
+    }
+
+
+def interval_width(table, km, estimate_time, level=0.9):
+    """Half-width of the prediction interval for one journey"""
+    i = bisect_right(table['distance_bins'], float(km))
+    j = bisect_right(table['time_bins'], float(estimate_time))
+    return table['quantiles'][i][j][table['levels'].index(level)]
+
+
+def interval_widths(table, km, estimate_time, level=0.9):
+    """Half-widths of the prediction intervals for arrays of journeys"""
+    quantiles = np.asarray(table['quantiles'])[:, :, table['levels'].index(level)]
+    i = np.searchsorted(table['distance_bins'], np.asarray(km, dtype=float), side='right')
+    j = np.searchsorted(table['time_bins'], np.asarray(estimate_time, dtype=float), side='right')
+    return quantiles[i, j]
+
+
+def save_interval_table(table, path):
+    import joblib
+
+    joblib.dump(table, path)
+
+
+def load_interval_table(path):
+    """Load an interval table, or None if it has not been built"""
+    import joblib
+
+    try:
+        return joblib.load(path)
+    except FileNotFoundError:
+        return None
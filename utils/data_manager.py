@@ -1,54 +1,302 @@
 # utils/data_manager.py
 import pandas as pd
+import io
 import os
-import streamlit as st
+import re
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from utils.cache import file_cached
+from utils.telemetry import TELEMETRY_DIR
+from utils.battery_health import (
+    add_journey, build_state, load_state, save_state, summarize_health
+)
+
+DATA_FILE = 'ev_journeys.csv'
 TEMP_JOURNEY_FILE = 'temp_journey.json'
+BATTERY_HEALTH_FILE = 'battery_health.json'
+DEFAULT_VEHICLE = 'default'
+VEHICLES_DIR = os.path.join('data', 'vehicles')
+VEHICLE_INDEX_FILE = os.path.join(VEHICLES_DIR, 'index.json')
+
+JOURNEY_COLUMNS = [
+    'google_map_km', 'google_map_estimate_time',  # Added new column
+    'battery_percent_before', 'drivable_km_before', 'total_km_before',
+    'temperature_before', 'timestamp_before', 'date_before',
+    'battery_percent_after', 'drivable_km_after', 'total_km_after',
+    'temperature_after', 'timestamp_after', 'date_after',
+    'journey_id'
+]
+
+# Journey ids look numeric but must round-trip unchanged to match telemetry directories
+JOURNEY_DTYPES = {'journey_id': str}
 
-def load_data():
-    if os.path.exists('ev_journeys.csv'):
-        df = pd.read_csv('ev_journeys.csv')
-        if not df.empty:
-            st.session_state.last_journey = df.iloc[-1].to_dict()
-        return df
-    return pd.DataFrame(columns=[
-        'google_map_km', 'google_map_estimate_time',  # Added new column
-        'battery_percent_before', 'drivable_km_before', 'total_km_before', 
-        'temperature_before', 'timestamp_before', 'date_before',
-        'battery_percent_after', 'drivable_km_after', 'total_km_after', 
-        'temperature_after', 'timestamp_after', 'date_after'
-    ])
-
-def save_data(df):
-    """Save data to CSV file"""
-    df.to_csv('ev_journeys.csv', index=False)
-
-def get_default_values():
-    """Get default values for new journey from last journey"""
-    if st.session_state.last_journey:
+VEHICLE_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+_index_lock = threading.Lock()
+
+def get_vehicle_paths(vehicle_id=DEFAULT_VEHICLE):
+    """File locations of one vehicle's data partition"""
+    if vehicle_id == DEFAULT_VEHICLE:
+        # The original single-car files remain the default partition
         return {
-            'battery': st.session_state.last_journey['battery_percent_after'],
-            'range': st.session_state.last_journey['drivable_km_after'],
-            'total': st.session_state.last_journey['total_km_after']
+            'data': DATA_FILE,
+            'temp': TEMP_JOURNEY_FILE,
+            'telemetry': TELEMETRY_DIR,
+            'health': BATTERY_HEALTH_FILE
         }
+    if not VEHICLE_ID_PATTERN.match(str(vehicle_id)):
+        raise ValueError(f"Invalid vehicle id: {vehicle_id!r}")
+    vehicle_dir = os.path.join(VEHICLES_DIR, vehicle_id)
+    return {
+        'data': os.path.join(vehicle_dir, 'journeys.csv'),
+        'temp': os.path.join(vehicle_dir, 'temp_journey.json'),
+        'telemetry': os.path.join(vehicle_dir, 'telemetry'),
+        'health': os.path.join(vehicle_dir, BATTERY_HEALTH_FILE)
+    }
+
+def list_vehicles():
+    """List all vehicles with a data partition, default vehicle first"""
+    vehicles = [DEFAULT_VEHICLE]
+    if os.path.isdir(VEHICLES_DIR):
+        vehicles += sorted(
+            name for name in os.listdir(VEHICLES_DIR)
+            if os.path.isdir(os.path.join(VEHICLES_DIR, name))
+            and name != DEFAULT_VEHICLE
+        )
+    return vehicles
+
+def add_vehicle(vehicle_id):
+    """Create an empty partition for a new vehicle"""
+    paths = get_vehicle_paths(vehicle_id)
+    os.makedirs(os.path.dirname(paths['data']) or '.', exist_ok=True)
+    return vehicle_id
+
+def _last_row_offset(path):
+    """Byte offset where the last CSV row of a file starts"""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        block = min(size, 65536)
+        f.seek(size - block)
+        tail = f.read(block)
+    # Skip the terminating newline of the last row
+    newline = tail.rfind(b'\n', 0, len(tail) - 1)
+    return size - block + newline + 1
+
+def _scan_partition(path):
+    """Row count and last row of a partition CSV without parsing the whole file"""
+    if not os.path.exists(path):
+        return 0, None
+    newlines, last_byte = 0, b''
+    with open(path, 'rb') as f:
+        header = f.readline()
+        for block in iter(lambda: f.read(1 << 20), b''):
+            newlines += block.count(b'\n')
+            last_byte = block[-1:]
+    rows = newlines + (last_byte not in (b'', b'\n'))
+    if rows == 0:
+        return 0, None
+    # Seek to the last row and parse it together with the header
+    with open(path, 'rb') as f:
+        f.seek(_last_row_offset(path))
+        last_line = f.read()
+    last_row = pd.read_csv(io.BytesIO(header + last_line), dtype=JOURNEY_DTYPES)
+    return rows, last_row.iloc[0].to_dict()
+
+def _load_index():
+    if os.path.exists(VEHICLE_INDEX_FILE):
+        with open(VEHICLE_INDEX_FILE, 'r') as f:
+            return json.load(f)
+    return {}
+
+def _save_index(index):
+    os.makedirs(VEHICLES_DIR, exist_ok=True)
+    tmp_path = VEHICLE_INDEX_FILE + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp_path, VEHICLE_INDEX_FILE)
+
+def _file_state(path):
+    """Size and modification time used to detect changes to a partition file"""
+    if not os.path.exists(path):
+        return 0, None
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+def _index_entry(path, rows, last_row):
+    """Build an index entry from the partition file and its last row"""
+    def value(key):
+        return None if last_row is None or pd.isna(last_row.get(key)) else float(last_row[key])
+    size, mtime_ns = _file_state(path)
+    return {
+        'rows': int(rows),
+        'size': size,
+        'mtime_ns': mtime_ns,
+        'last_battery': value('battery_percent_after'),
+        'last_range': value('drivable_km_after'),
+        'last_odometer': value('total_km_after')
+    }
+
+def _update_index(vehicle_id, entry):
+    with _index_lock:
+        index = _load_index()
+        index[vehicle_id] = entry
+        _save_index(index)
+
+def get_vehicle_index(vehicle_id=DEFAULT_VEHICLE, persist=True):
+    """Get the index entry of a vehicle, rebuilding it if the partition changed.
+
+    With persist=False a rebuilt entry is returned without writing the index.
+    """
+    path = get_vehicle_paths(vehicle_id)['data']
+    entry = _load_index().get(vehicle_id)
+    if entry is None or (entry['size'], entry.get('mtime_ns')) != _file_state(path):
+        rows, last_row = _scan_partition(path)
+        entry = _index_entry(path, rows, last_row)
+        # Only partitions with data are indexed, so lookups never create vehicles
+        if persist and os.path.exists(path):
+            _update_index(vehicle_id, entry)
+    return entry
+
+def read_partition(vehicle_id=DEFAULT_VEHICLE):
+    """Read one vehicle's journeys without touching session state"""
+    path = get_vehicle_paths(vehicle_id)['data']
+    if os.path.exists(path):
+        # Parsed once per file version and shared; callers get their own copy
+        return file_cached('partition', path, lambda: pd.read_csv(path, dtype=JOURNEY_DTYPES)).copy()
+    return pd.DataFrame(columns=JOURNEY_COLUMNS)
+
+def validate_journeys(df):
+    """List problems that would break analytics on a journey table"""
+    problems = []
+    # journey_id is optional for journeys recorded before telemetry support
+    missing = [column for column in JOURNEY_COLUMNS[:-1] if column not in df.columns]
+    if missing:
+        problems.append(f"missing columns: {', '.join(missing)}")
+    numeric_columns = [
+        column for column in JOURNEY_COLUMNS
+        if column not in missing and not column.startswith(('timestamp', 'date', 'journey'))
+    ]
+    for column in numeric_columns:
+        if not pd.api.types.is_numeric_dtype(df[column]):
+            problems.append(f"non-numeric values in {column}")
+    for column in ('date_before', 'date_after'):
+        if column in df.columns and pd.to_datetime(df[column], errors='coerce').isna().any():
+            problems.append(f"invalid dates in {column}")
+    return problems
+
+def load_data(vehicle_id=DEFAULT_VEHICLE):
+    import streamlit as st  # Deferred so headless reporting never loads streamlit
+
+    df = read_partition(vehicle_id)
+    if not df.empty:
+        st.session_state.last_journey = df.iloc[-1].to_dict()
+    return df
+
+def save_data(df, vehicle_id=DEFAULT_VEHICLE):
+    """Save data to the vehicle's CSV file"""
+    path = get_vehicle_paths(vehicle_id)['data']
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    df.to_csv(path, index=False)
+    last_row = df.iloc[-1].to_dict() if not df.empty else None
+    entry = _index_entry(path, len(df), last_row)
+    _update_index(vehicle_id, entry)
+    # Edited history invalidates the running estimate, so replay it
+    _save_battery_health(vehicle_id, build_state(df), entry)
+
+def append_journey(journey, vehicle_id=DEFAULT_VEHICLE):
+    """Append one journey to the vehicle's CSV file without rewriting it"""
+    path = get_vehicle_paths(vehicle_id)['data']
+    header = None
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        with open(path, 'r') as f:
+            header = f.readline().rstrip('\r\n').split(',')
+
+    if header is None or not set(journey).issubset(header):
+        # New partition or new columns: fall back to a full rewrite
+        df = pd.concat([read_partition(vehicle_id), pd.DataFrame([journey])], ignore_index=True)
+        save_data(df, vehicle_id)
+        return
+
+    entry = get_vehicle_index(vehicle_id)
+    state = load_state(get_vehicle_paths(vehicle_id)['health'])
+    up_to_date = _health_matches(state, entry)
+    with open(path, 'a') as f:
+        pd.DataFrame([journey]).reindex(columns=header).to_csv(f, header=False, index=False)
+    size, mtime_ns = _file_state(path)
+    entry.update({
+        'rows': entry['rows'] + 1,
+        'size': size,
+        'mtime_ns': mtime_ns,
+        'last_battery': float(journey['battery_percent_after']),
+        'last_range': float(journey['drivable_km_after']),
+        'last_odometer': float(journey['total_km_after'])
+    })
+    _update_index(vehicle_id, entry)
+
+    if up_to_date:
+        _save_battery_health(vehicle_id, add_journey(state, journey), entry)
+    else:
+        get_battery_health(vehicle_id)
+
+def _health_matches(state, entry):
+    """Whether the estimator state was built from the partition version in entry"""
+    return state is not None and (state['rows'], state['size'], state.get('mtime_ns')) == (
+        entry['rows'], entry['size'], entry.get('mtime_ns'))
+
+def _save_battery_health(vehicle_id, state, entry):
+    state['rows'], state['size'], state['mtime_ns'] = entry['rows'], entry['size'], entry['mtime_ns']
+    save_state(get_vehicle_paths(vehicle_id)['health'], state)
+
+def get_battery_health(vehicle_id=DEFAULT_VEHICLE, persist=True):
+    """Get the vehicle's battery state-of-health summary.
+
+    The estimate is updated incrementally as journeys are appended and only
+    replayed from the full history when it is missing or out of date; with
+    persist=False a replayed estimate is not saved, so nothing is written.
+    Returns None for vehicles without recorded journeys.
+    """
+    if not os.path.exists(get_vehicle_paths(vehicle_id)['data']):
+        return None
+    entry = get_vehicle_index(vehicle_id, persist)
+    state = load_state(get_vehicle_paths(vehicle_id)['health'])
+    if not _health_matches(state, entry):
+        state = build_state(read_partition(vehicle_id))
+        if persist:
+            _save_battery_health(vehicle_id, state, entry)
+    return summarize_health(state)
+
+def map_partitions(func, vehicle_ids=None, max_workers=None):
+    """Apply func(vehicle_id) to each vehicle partition in parallel"""
+    if vehicle_ids is None:
+        vehicle_ids = list_vehicles()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(func, vehicle_ids)
+        return dict(zip(vehicle_ids, results))
+
+def get_default_values(vehicle_id=DEFAULT_VEHICLE):
+    """Get default values for new journey from the vehicle's last journey"""
+    entry = get_vehicle_index(vehicle_id)
     return {
-        'battery': 100,
-        'range': 0,
-        'total': 0
+        'battery': 100 if entry['last_battery'] is None else entry['last_battery'],
+        'range': entry['last_range'] or 0,
+        'total': entry['last_odometer'] or 0
     }
 
-def save_temp_journey(journey_data):
+def save_temp_journey(journey_data, vehicle_id=DEFAULT_VEHICLE):
     """Save temporary journey data to file"""
-    with open(TEMP_JOURNEY_FILE, 'w') as f:
+    path = get_vehicle_paths(vehicle_id)['temp']
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
         json.dump(journey_data, f)
 
-def load_temp_journey():
+def load_temp_journey(vehicle_id=DEFAULT_VEHICLE):
     """Load temporary journey data from file with backward compatibility"""
+    path = get_vehicle_paths(vehicle_id)['temp']
     try:
-        if os.path.exists(TEMP_JOURNEY_FILE):
-            with open(TEMP_JOURNEY_FILE, 'r') as f:
+        if os.path.exists(path):
+            with open(path, 'r') as f:
                 data = json.load(f)
                 # Ensure all required fields exist with defaults
                 defaults = {
@@ -62,13 +310,19 @@ def load_temp_journey():
                 }
                 # Update defaults with actual data
                 defaults.update(data)
+                # Journeys started before telemetry support have no id yet
+                if not defaults.get('journey_id'):
+                    defaults['journey_id'] = (defaults['date_before'].replace('-', '')
+                                              + defaults['timestamp_before'].replace(':', ''))
                 return defaults
     except Exception as e:
+        import streamlit as st
         st.error(f"Error loading journey data: {str(e)}")
-        clear_temp_journey()  # Clear corrupted data
+        clear_temp_journey(vehicle_id)  # Clear corrupted data
         return None
 
-def clear_temp_journey():
+def clear_temp_journey(vehicle_id=DEFAULT_VEHICLE):
     """Remove temporary journey file"""
-    if os.path.exists(TEMP_JOURNEY_FILE):
-        os.remove(TEMP_JOURNEY_FILE)
\ No newline at end of file
+    path = get_vehicle_paths(vehicle_id)['temp']
+    if os.path.exists(path):
+        os.remove(path)
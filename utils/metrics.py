@@ -0,0 +1,177 @@
+# utils/metrics.py
+import pandas as pd
+import numpy as np
+
+from utils.cache import file_cached
+from utils.data_manager import read_partition, get_vehicle_paths
+
+def calculate_analytics_data(df):
+    """Calculate all analytics metrics from the dataframe with focus on battery efficiency"""
+    df = df.copy()
+
+    # Basic distance and battery calculations
+    df['actual_distance'] = df['total_km_after'] - df['total_km_before']
+    df['battery_used'] = df['battery_percent_before'] - df['battery_percent_after']
+    df['avg_temperature'] = (df['temperature_before'] + df['temperature_after']) / 2
+
+    # Time and speed calculations - fixed by combining date and time
+    df['start_datetime'] = pd.to_datetime(df['date_before'] + ' ' + df['timestamp_before'])
+    df['end_datetime'] = pd.to_datetime(df['date_after'] + ' ' + df['timestamp_after'])
+    df['actual_time'] = df['end_datetime'] - df['start_datetime']
+    df['actual_time_minutes'] = df['actual_time'].dt.total_seconds() / 60
+    df['time_difference'] = df['actual_time_minutes'] - df['google_map_estimate_time']
+    df['time_accuracy'] = (df['google_map_estimate_time'] / df['actual_time_minutes']) * 100
+    df['average_speed'] = df['actual_distance'] / (df['actual_time_minutes'] / 60)  # km/h
+
+    # Filter valid data before calculating efficiency
+    valid_data = df[
+        (df['battery_used'] > 0) &
+        (df['actual_distance'] > 0) &
+        (df['actual_time_minutes'] > 0)
+    ].copy()
+
+    if not valid_data.empty:
+        # Battery efficiency metrics
+        valid_data['km_per_battery'] = valid_data['actual_distance'] / valid_data['battery_used']
+        valid_data['km_per_hour'] = valid_data['actual_distance'] / (valid_data['actual_time_minutes'] / 60)
+        valid_data['battery_per_hour'] = valid_data['battery_used'] / (valid_data['actual_time_minutes'] / 60)
+
+        # Categorize temperatures
+        valid_data['temp_category'] = pd.cut(
+            valid_data['avg_temperature'],
+            bins=[-np.inf, 0, 10, 20, 30, np.inf],
+            labels=['Below 0°C', '0-10°C', '10-20°C', '20-30°C', 'Above 30°C']
+        )
+
+        # Time efficiency categories - add safeguard for divide by zero
+        valid_data['time_accuracy'] = np.where(
+            valid_data['actual_time_minutes'] > 0,
+            (valid_data['google_map_estimate_time'] / valid_data['actual_time_minutes']) * 100,
+            100  # Default to 100% if time is zero
+        )
+
+        valid_data['time_efficiency'] = pd.cut(
+            valid_data['time_accuracy'],
+            bins=[0, 80, 90, 110, 120, np.inf],
+            labels=['Very Slow', 'Slower', 'On Time', 'Faster', 'Very Fast']
+        )
+
+    return valid_data
+
+def get_analytics_data(vehicle_id):
+    """Analytics data of a vehicle partition, computed once per file version"""
+    def compute():
+        df = read_partition(vehicle_id)
+        return calculate_analytics_data(df) if not df.empty else df
+
+    path = get_vehicle_paths(vehicle_id)['data']
+    return file_cached('analytics', path, compute).copy()
+
+def filter_date_range(df, start=None, end=None):
+    """Keep journeys whose start date falls within [start, end]"""
+    if df.empty or (start is None and end is None):
+        return df
+    dates = pd.to_datetime(df['date_before'])
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= dates >= pd.Timestamp(start)
+    if end is not None:
+        mask &= dates <= pd.Timestamp(end)
+    return df[mask]
+
+def battery_overview(df):
+    """Key battery efficiency metrics"""
+    avg_efficiency = df['km_per_battery'].mean()
+    return {
+        'avg_km_per_battery': avg_efficiency,
+        'theoretical_range_km': avg_efficiency * 100,
+        'efficiency_std': df['km_per_battery'].std()
+    }
+
+def temperature_breakdown(df):
+    """Efficiency statistics per temperature range"""
+    return df.groupby('temp_category')['km_per_battery'].agg([
+        ('avg_efficiency', 'mean'),
+        ('min_efficiency', 'min'),
+        ('max_efficiency', 'max'),
+        ('journey_count', 'count')
+    ]).reset_index()
+
+def daily_efficiency(df):
+    """Average efficiency per day, oldest first"""
+    trend_data = pd.DataFrame({
+        'Date': pd.to_datetime(df['date_before']),
+        'Efficiency (km/%)': df['km_per_battery']
+    })
+    return (trend_data
+        .groupby('Date')['Efficiency (km/%)']
+        .mean()
+        .reset_index()
+        .sort_values('Date'))
+
+def efficiency_trends(daily):
+    """Recent efficiency and trend statistics from daily efficiency"""
+    recent_efficiency = daily.iloc[-1]['Efficiency (km/%)']
+    avg_efficiency = daily['Efficiency (km/%)'].mean()
+    trends = {
+        'recent_efficiency': recent_efficiency,
+        'efficiency_change_pct': ((recent_efficiency - avg_efficiency) / avg_efficiency) * 100,
+        'trend_change_pct': None
+    }
+
+    # Calculate efficiency trend (positive or negative)
+    if len(daily) > 1:
+        first_half_avg = daily['Efficiency (km/%)'].iloc[:len(daily)//2].mean()
+        second_half_avg = daily['Efficiency (km/%)'].iloc[len(daily)//2:].mean()
+        trends['trend_change_pct'] = ((second_half_avg - first_half_avg) / first_half_avg) * 100
+    return trends
+
+def consumption_patterns(df):
+    """Distance vs battery usage statistics"""
+    return {
+        'distance_battery_correlation': df['actual_distance'].corr(df['battery_used'])
+    }
+
+def time_analysis(df):
+    """Time estimation accuracy and speed statistics"""
+    return {
+        'avg_time_accuracy': df['time_accuracy'].mean(),
+        'avg_speed_kmh': df['average_speed'].mean()
+    }
+
+def summarize_vehicle(vehicle_id):
+    """Compute headline metrics for one vehicle partition"""
+    df = read_partition(vehicle_id)
+    analytics_df = get_analytics_data(vehicle_id)
+    return {
+        'Vehicle': vehicle_id,
+        'Journeys': len(df),
+        'Distance (km)': analytics_df['actual_distance'].sum() if not analytics_df.empty else 0,
+        'Average km/%': analytics_df['km_per_battery'].mean() if not analytics_df.empty else np.nan,
+        'Average Speed (km/h)': analytics_df['average_speed'].mean() if not analytics_df.empty else np.nan
+    }
+
+def build_report(df, start=None, end=None):
+    """Compute every analytics section for a date range as plain values"""
+    df = filter_date_range(df, start, end)
+    analytics_df = calculate_analytics_data(df) if not df.empty else df
+    report = {
+        'start': None if start is None else str(start),
+        'end': None if end is None else str(end),
+        'journeys': len(df),
+        'valid_journeys': len(analytics_df)
+    }
+    if analytics_df.empty:
+        return report
+
+    report.update({
+        'battery_overview': battery_overview(analytics_df),
+        'efficiency_trends': efficiency_trends(daily_efficiency(analytics_df)),
+        'time_analysis': time_analysis(analytics_df),
+        'consumption_patterns': consumption_patterns(analytics_df),
+        'temperature_breakdown': [
+            {**row, 'temp_category': str(row['temp_category'])}
+            for row in temperature_breakdown(analytics_df).to_dict('records')
+        ]
+    })
+    return report
@@ -0,0 +1,30 @@
+# utils/models.py
+from pathlib import Path
+
+from utils.cache import file_cached
+from utils.conformal import load_interval_table
+
+# Path to the model files
+MODELS_DIR = Path("machine_learning/weights")
+TIME_MODEL_PATH = MODELS_DIR / "actual_time_drive_model.joblib"
+BATTERY_MODEL_PATH = MODELS_DIR / "battery_usage_model.joblib"
+TIME_INTERVALS_PATH = MODELS_DIR / "actual_time_drive_model_intervals.joblib"
+BATTERY_INTERVALS_PATH = MODELS_DIR / "battery_usage_model_intervals.joblib"
+
+
+def load_model_files():
+    """Load the machine learning models, raising if they cannot be read"""
+    import joblib  # Deferred so importing this module stays cheap
+
+    # Loaded once per server process and shared by all sessions
+    time_model = file_cached('model', TIME_MODEL_PATH, lambda: joblib.load(TIME_MODEL_PATH))
+    battery_model = file_cached('model', BATTERY_MODEL_PATH, lambda: joblib.load(BATTERY_MODEL_PATH))
+    return time_model, battery_model
+
+
+def load_interval_files():
+    """Load the prediction-interval tables (None for tables not built yet)"""
+    return tuple(
+        file_cached('intervals', path, lambda: load_interval_table(path))
+        for path in (TIME_INTERVALS_PATH, BATTERY_INTERVALS_PATH)
+    )
@@ -0,0 +1,107 @@
+# utils/range_risk.py
+import numpy as np
+import pandas as pd
+
+from utils.conformal import fit_copy, out_of_sample_predictions
+from utils.metrics import calculate_analytics_data
+
+FEATURE_COLUMNS = ['google_map_km', 'google_map_estimate_time']
+MIN_PREDICTED_USAGE = 2.0   # % battery; shorter trips are dominated by rounding of the gauge
+MIN_PROFILE_JOURNEYS = 5
+DEFAULT_SCENARIOS = 5000
+DEFAULT_QUANTILES = (0.05, 0.5, 0.95)
+
+
+def build_risk_profile(df, battery_model):
+    """Fit the battery model to one vehicle and collect its error and temperature effect.
+
+    A copy of `battery_model` is refitted on the vehicle's journeys, so its
+    consumption (which may differ from the journeys the shipped model was
+    trained on) is captured; the profile's `model` is then used to predict
+    routes. Errors are leave-one-out errors of that refit, kept as ratios of
+    actual to predicted usage so they scale with trip length. The ratio is
+    regressed on average trip temperature and the remaining residuals form
+    the sampling distribution.
+    """
+    journeys = calculate_analytics_data(df) if not df.empty else df
+    if len(journeys) < MIN_PROFILE_JOURNEYS:
+        return None
+
+    X = journeys[FEATURE_COLUMNS].to_numpy(dtype=float)
+    used = journeys['battery_used'].to_numpy(dtype=float)
+    predicted = out_of_sample_predictions(battery_model, X, used)
+    keep = predicted >= MIN_PREDICTED_USAGE
+    if keep.sum() < MIN_PROFILE_JOURNEYS:
+        keep = predicted > 0
+    if not keep.any():
+        return None
+
+    ratio = used[keep] / predicted[keep]
+    temperature = journeys['avg_temperature'].to_numpy(dtype=float)[keep]
+    if len(ratio) >= 3 and np.ptp(temperature) > 0:
+        temp_slope, temp_intercept = np.polyfit(temperature, ratio, 1)
+    else:
+        temp_slope, temp_intercept = 0.0, ratio.mean()
+
+    temp_drift = (journeys['temperature_after'] - journeys['temperature_before']).to_numpy(dtype=float)
+    return {
+        'model': fit_copy(battery_model, X, used),
+        'residuals': ratio - (temp_slope * temperature + temp_intercept),
+        'temp_drift': temp_drift[keep],
+        'temp_slope': float(temp_slope),
+        'temp_intercept': float(temp_intercept),
+        'journeys': int(keep.sum())
+    }
+
+
+def simulate_arrival_soc(profile, predicted_usage, start_soc, temperature,
+                         n_scenarios=DEFAULT_SCENARIOS, seed=None):
+    """Simulate arrival battery % for many routes at once.
+
+    `predicted_usage`, `start_soc` and `temperature` are scalars or arrays of
+    one value per route. Returns an array of shape (routes, n_scenarios).
+    """
+    predicted = np.atleast_1d(np.asarray(predicted_usage, dtype=float))
+    start = np.broadcast_to(np.asarray(start_soc, dtype=float), predicted.shape)
+    temp = np.broadcast_to(np.asarray(temperature, dtype=float), predicted.shape)
+    rng = np.random.default_rng(seed)
+    shape = (len(predicted), n_scenarios)
+
+    # Temperature changes over the trip as seen in past journeys
+    drift = profile['temp_drift'][rng.integers(0, len(profile['temp_drift']), shape)]
+    trip_temp = temp[:, None] + drift / 2
+
+    residuals = profile['residuals'][rng.integers(0, len(profile['residuals']), shape)]
+    ratio = profile['temp_slope'] * trip_temp + profile['temp_intercept'] + residuals
+    usage = np.maximum(predicted[:, None] * ratio, 0)
+    return start[:, None] - usage
+
+
+def summarize_arrival(arrival, reserve_soc, quantiles=DEFAULT_QUANTILES):
+    """Reduce simulated arrival battery % to per-route risk figures"""
+    summary = pd.DataFrame({
+        'prob_above_reserve': (arrival >= reserve_soc).mean(axis=1)
+    })
+    for q, values in zip(quantiles, np.quantile(arrival, quantiles, axis=1)):
+        summary[f'arrival_p{round(q * 100)}'] = values
+    return summary
+
+
+def assess_routes(profile, routes, reserve_soc,
+                  n_scenarios=DEFAULT_SCENARIOS, seed=None):
+    """Score a table of routes in one batch.
+
+    `routes` needs FEATURE_COLUMNS plus `start_battery` and `temperature`
+    columns. Usage is predicted with the profile's vehicle model, the one its
+    errors were measured for. Returns the routes with predicted usage and
+    risk columns added.
+    """
+    routes = routes.reset_index(drop=True)
+    predicted = np.clip(profile['model'].predict(routes[FEATURE_COLUMNS].to_numpy(dtype=float)), 0, 100)
+    arrival = simulate_arrival_soc(
+        profile, predicted, routes['start_battery'].to_numpy(dtype=float),
+        routes['temperature'].to_numpy(dtype=float), n_scenarios, seed
+    )
+    result = routes.copy()
+    result['predicted_usage'] = predicted
+    return pd.concat([result, summarize_arrival(arrival, reserve_soc)], axis=1)
@@ -0,0 +1,231 @@
+# utils/telemetry.py
+import os
+import json
+import numpy as np
+import pandas as pd
+
+TELEMETRY_DIR = 'telemetry'
+TELEMETRY_FIELDS = ['timestamp', 'soc', 'speed', 'temperature', 'range']
+CHUNK_SIZE = 65536          # Raw samples per chunk file
+DOWNSAMPLE_FACTOR = 64      # Samples per bucket between summary levels
+MAX_LEVELS = 4
+DTYPE = np.float64
+
+# Summary rows hold the mean, min and max of every field for one bucket
+SUMMARY_WIDTH = 3 * len(TELEMETRY_FIELDS)
+
+
+def _journey_dir(journey_id, root=TELEMETRY_DIR):
+    return os.path.join(root, str(journey_id))
+
+
+def _chunk_path(journey_dir, chunk_index):
+    return os.path.join(journey_dir, f'chunk_{chunk_index:05d}.f8')
+
+
+def _level_path(journey_dir, level):
+    return os.path.join(journey_dir, f'level_{level}.f8')
+
+
+def _row_count(path, width):
+    """Number of rows stored in a raw float64 file"""
+    if not os.path.exists(path):
+        return 0
+    return os.path.getsize(path) // (width * DTYPE().itemsize)
+
+
+def _open_rows(path, width):
+    """Memory-map a raw float64 file as a (rows, width) array"""
+    rows = _row_count(path, width)
+    if rows == 0:
+        return np.empty((0, width), dtype=DTYPE)
+    return np.memmap(path, dtype=DTYPE, mode='r', shape=(rows, width))
+
+
+def _append_rows(path, rows):
+    with open(path, 'ab') as f:
+        f.write(np.ascontiguousarray(rows, dtype=DTYPE).tobytes())
+
+
+def _summarize(rows, level):
+    """Collapse consecutive buckets of DOWNSAMPLE_FACTOR rows into summary rows"""
+    n_fields = len(TELEMETRY_FIELDS)
+    buckets = rows.reshape(-1, DOWNSAMPLE_FACTOR, rows.shape[1])
+    if level == 1:
+        # Raw samples: mean, min and max all come from the same values
+        return np.hstack([
+            buckets.mean(axis=1), buckets.min(axis=1), buckets.max(axis=1)
+        ])
+    return np.hstack([
+        buckets[:, :, :n_fields].mean(axis=1),
+        buckets[:, :, n_fields:2 * n_fields].min(axis=1),
+        buckets[:, :, 2 * n_fields:].max(axis=1)
+    ])
+
+
+def _load_meta(journey_dir):
+    meta_path = os.path.join(journey_dir, 'meta.json')
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r') as f:
+            return json.load(f)
+    return {'fields': TELEMETRY_FIELDS, 'count': 0}
+
+
+def _save_meta(journey_dir, meta):
+    with open(os.path.join(journey_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+
+def _update_levels(journey_dir, old_count, new_count):
+    """Append newly completed buckets to every summary level"""
+    for level in range(1, MAX_LEVELS + 1):
+        bucket = DOWNSAMPLE_FACTOR ** level
+        first, last = old_count // bucket, new_count // bucket
+        if last == first:
+            break
+        if level == 1:
+            source = read_telemetry_rows(journey_dir, first * bucket, last * bucket)
+        else:
+            source = _open_rows(_level_path(journey_dir, level - 1), SUMMARY_WIDTH)
+            source = source[first * DOWNSAMPLE_FACTOR:last * DOWNSAMPLE_FACTOR]
+        _append_rows(_level_path(journey_dir, level), _summarize(np.asarray(source), level))
+
+
+def append_telemetry(journey_id, samples, root=TELEMETRY_DIR):
+    """Append timestamped samples to a journey's telemetry store.
+
+    `samples` is anything convertible to a (n, len(TELEMETRY_FIELDS)) float
+    array, or a DataFrame with TELEMETRY_FIELDS columns. Timestamps are epoch
+    seconds. Returns the total number of samples stored for the journey.
+    """
+    if isinstance(samples, pd.DataFrame):
+        samples = samples[TELEMETRY_FIELDS].to_numpy(dtype=DTYPE)
+    samples = np.atleast_2d(np.asarray(samples, dtype=DTYPE))
+    if samples.shape[1] != len(TELEMETRY_FIELDS):
+        raise ValueError(f"Expected {len(TELEMETRY_FIELDS)} fields per sample, got {samples.shape[1]}")
+
+    journey_dir = _journey_dir(journey_id, root)
+    os.makedirs(journey_dir, exist_ok=True)
+    meta = _load_meta(journey_dir)
+    old_count = meta['count']
+
+    # Fill the current chunk, then roll over to new chunk files
+    count = old_count
+    offset = 0
+    while offset < len(samples):
+        chunk_index, position = divmod(count, CHUNK_SIZE)
+        take = min(CHUNK_SIZE - position, len(samples) - offset)
+        _append_rows(_chunk_path(journey_dir, chunk_index), samples[offset:offset + take])
+        offset += take
+        count += take
+
+    meta['count'] = count
+    _save_meta(journey_dir, meta)
+    _update_levels(journey_dir, old_count, count)
+    return count
+
+
+def telemetry_count(journey_id, root=TELEMETRY_DIR):
+    """Number of samples stored for a journey"""
+    return _load_meta(_journey_dir(journey_id, root))['count']
+
+
+def read_telemetry_rows(journey_dir, start=0, stop=None):
+    """Read raw samples [start, stop) from the chunk files of a journey directory"""
+    count = _load_meta(journey_dir)['count']
+    stop = count if stop is None else min(stop, count)
+    if start >= stop:
+        return np.empty((0, len(TELEMETRY_FIELDS)), dtype=DTYPE)
+
+    parts = []
+    for chunk_index in range(start // CHUNK_SIZE, (stop - 1) // CHUNK_SIZE + 1):
+        chunk = _open_rows(_chunk_path(journey_dir, chunk_index), len(TELEMETRY_FIELDS))
+        base = chunk_index * CHUNK_SIZE
+        parts.append(chunk[max(start - base, 0):stop - base])
+    return np.concatenate(parts)
+
+
+def load_telemetry(journey_id, start=0, stop=None, root=TELEMETRY_DIR):
+    """Load a window of raw samples as a DataFrame"""
+    rows = read_telemetry_rows(_journey_dir(journey_id, root), start, stop)
+    return pd.DataFrame(rows, columns=TELEMETRY_FIELDS)
+
+
+def _tail_summary(journey_dir, level, count):
+    """Summary row of the samples past the last full bucket of `level`.
+
+    Built from the unsummarized rows of each finer level plus the raw
+    remainder, so fewer than DOWNSAMPLE_FACTOR rows are read per level.
+    Returns None when every sample is already summarized.
+    """
+    n_fields = len(TELEMETRY_FIELDS)
+    parts, weights = [], []
+    covered = _row_count(_level_path(journey_dir, level), SUMMARY_WIDTH) * DOWNSAMPLE_FACTOR
+    for finer in range(level - 1, 0, -1):
+        rows = _open_rows(_level_path(journey_dir, finer), SUMMARY_WIDTH)
+        parts.append(np.asarray(rows[covered:]))
+        weights.append(np.full(len(parts[-1]), DOWNSAMPLE_FACTOR ** finer))
+        covered = len(rows) * DOWNSAMPLE_FACTOR
+    raw = read_telemetry_rows(journey_dir, covered, count)
+    parts.append(np.hstack([raw, raw, raw]))
+    weights.append(np.ones(len(raw)))
+
+    rows, weights = np.vstack(parts), np.concatenate(weights)
+    if len(rows) == 0:
+        return None
+    # Means are weighted by the number of samples behind each row
+    return np.concatenate([
+        np.average(rows[:, :n_fields], axis=0, weights=weights),
+        rows[:, n_fields:2 * n_fields].min(axis=0),
+        rows[:, 2 * n_fields:].max(axis=0)
+    ])
+
+
+def load_telemetry_summary(journey_id, max_points=2000, root=TELEMETRY_DIR):
+    """Load a downsampled view of a journey's telemetry for plotting.
+
+    Picks the finest summary level that fits in `max_points` rows, so only
+    that level (plus one row for the incomplete last bucket) is read from
+    disk. Returns a DataFrame with `<field>`, `<field>_min` and `<field>_max`
+    columns.
+    """
+    journey_dir = _journey_dir(journey_id, root)
+    count = _load_meta(journey_dir)['count']
+    columns = (TELEMETRY_FIELDS
+               + [f'{field}_min' for field in TELEMETRY_FIELDS]
+               + [f'{field}_max' for field in TELEMETRY_FIELDS])
+
+    level = 0
+    while level < MAX_LEVELS and count // DOWNSAMPLE_FACTOR ** level > max_points:
+        level += 1
+
+    if level == 0:
+        raw = read_telemetry_rows(journey_dir)
+        return pd.DataFrame(np.hstack([raw, raw, raw]), columns=columns)
+
+    summary = np.asarray(_open_rows(_level_path(journey_dir, level), SUMMARY_WIDTH))
+    tail_row = _tail_summary(journey_dir, level, count)
+    if tail_row is not None:
+        summary = np.vstack([summary, tail_row.reshape(1, SUMMARY_WIDTH)])
+    return pd.DataFrame(summary, columns=columns)
+
+
+def import_telemetry_csv(journey_id, file, chunksize=100000, root=TELEMETRY_DIR):
+    """Stream a telemetry CSV into the store without loading it all at once"""
+    count = telemetry_count(journey_id, root)
+    for chunk in pd.read_csv(file, chunksize=chunksize):
+        if not pd.api.types.is_numeric_dtype(chunk['timestamp']):
+            # Datetime strings: convert to epoch seconds whatever the parsed resolution
+            timestamps = pd.to_datetime(chunk['timestamp'])
+            chunk['timestamp'] = (timestamps - pd.Timestamp(0)) / pd.Timedelta(seconds=1)
+        count = append_telemetry(journey_id, chunk, root)
+    return count
+
+
+def clear_telemetry(journey_id, root=TELEMETRY_DIR):
+    """Remove all telemetry stored for a journey"""
+    journey_dir = _journey_dir(journey_id, root)
+    if os.path.isdir(journey_dir):
+        for name in os.listdir(journey_dir):
+            os.remove(os.path.join(journey_dir, name))
+        os.rmdir(journey_dir)
@@ -0,0 +1,127 @@
+# utils/warmup.py
+"""Server warm-up: preload models, data and analytics before users need them.
+
+`start_warmup()` runs once per server process in a background thread; the
+results land in the shared caches used by the tabs. `run.py` starts it before
+the server accepts sessions. Run it directly to measure cold-start cost
+without the UI:
+    python -m utils.warmup
+"""
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+STAGES = ['models', 'data', 'analytics']
+
+_status = {
+    'state': 'idle',
+    'started': None,
+    'seconds': None,
+    'stages': {name: {'state': 'pending', 'seconds': None, 'detail': None} for name in STAGES}
+}
+_lock = threading.Lock()
+
+
+def _load_models():
+    # scikit-learn is imported while unpickling, under the model cache lock, so
+    # it never races a session importing it through the same path
+    from utils.models import load_model_files, load_interval_files
+
+    load_model_files()
+    tables = sum(table is not None for table in load_interval_files())
+    return f"2 models, {tables} interval tables", []
+
+
+def _load_data():
+    from utils.data_manager import (
+        map_partitions, read_partition, get_vehicle_index, validate_journeys
+    )
+
+    def load(vehicle_id):
+        df = read_partition(vehicle_id)
+        get_vehicle_index(vehicle_id)
+        return len(df), validate_journeys(df)
+
+    results = map_partitions(load)
+    journeys = sum(rows for rows, _ in results.values())
+    problems = [f"{vehicle}: {problem}"
+                for vehicle, (_, vehicle_problems) in results.items()
+                for problem in vehicle_problems]
+    return f"{len(results)} vehicles, {journeys} journeys", problems
+
+
+def _prime_analytics():
+    from utils.data_manager import map_partitions, get_battery_health
+    from utils.metrics import summarize_vehicle
+
+    def prime(vehicle_id):
+        summarize_vehicle(vehicle_id)   # Fills the analytics cache of the partition
+        get_battery_health(vehicle_id)
+
+    return f"{len(map_partitions(prime))} vehicles", []
+
+
+_STAGE_FUNCTIONS = {
+    'models': _load_models,
+    'data': _load_data,
+    'analytics': _prime_analytics
+}
+
+
+def run_warmup():
+    """Run every warm-up stage in order, recording its state and duration.
+
+    Each stage returns a detail string and a list of problems. A stage that
+    raises is `failed` and one reporting problems is `degraded`; either makes
+    the overall state `degraded`.
+    """
+    _status['state'] = 'running'
+    _status['started'] = time.time()
+    total_start = time.perf_counter()
+    degraded = False
+
+    for name in STAGES:
+        stage = _status['stages'][name]
+        stage['state'] = 'running'
+        start = time.perf_counter()
+        try:
+            detail, problems = _STAGE_FUNCTIONS[name]()
+            stage['detail'] = "; ".join([detail, *problems])
+            stage['state'] = 'degraded' if problems else 'done'
+            degraded = degraded or bool(problems)
+        except Exception as e:
+            stage['detail'] = str(e)
+            stage['state'] = 'failed'
+            degraded = True
+            logger.exception("Warm-up stage %s failed", name)
+        stage['seconds'] = time.perf_counter() - start
+        logger.info("Warm-up stage %s %s in %.2fs", name, stage['state'], stage['seconds'])
+
+    _status['seconds'] = time.perf_counter() - total_start
+    _status['state'] = 'degraded' if degraded else 'ready'
+    return get_warmup_status()
+
+
+def start_warmup():
+    """Start the warm-up in the background once per server process"""
+    with _lock:
+        if _status['state'] != 'idle':
+            return False
+        _status['state'] = 'running'
+    threading.Thread(target=run_warmup, name='warmup', daemon=True).start()
+    return True
+
+
+def get_warmup_status():
+    """Snapshot of the warm-up state and per-stage timings"""
+    return {
+        **_status,
+        'stages': {name: dict(stage) for name, stage in _status['stages'].items()}
+    }
+
+
+if __name__ == '__main__':
+    print(json.dumps(run_warmup(), indent=2))